@@ -1,8 +1,11 @@
 
 import asyncio
 import logging
+import platform
 from bleak import BleakClient, BleakScanner
+from bleak.backends.device import BLEDevice
 _LOGGER = logging.getLogger(__name__)
+DEFAULT_MTU = 23 # BLE default ATT MTU, 20 bytes of notification payload
 class DeviceManager:
     def __init__(self, mac_address, alias=None, adapter='hci0'):
         self.mac_address = mac_address.upper()
@@ -22,27 +25,97 @@ class DeviceManager:
         if not self.device_found:
             logging.error("Device not found: %s", self.mac_address)
 
+def known_bluez_device(mac_address, adapter='hci0', path=None):
+    """BLEDevice pointing at the object BlueZ keeps for a device it has seen before, or None off BlueZ.
+
+    A BleakClient built from it connects straight away; one built from a bare address scans first.
+    If BlueZ no longer knows the device the connect fails and the caller falls back to discovery.
+    """
+    if platform.system() != 'Linux':
+        return None
+    mac_address = mac_address.upper()
+    path = path or f"/org/bluez/{adapter or 'hci0'}/dev_{mac_address.replace(':', '_')}"
+    details = {'path': path, 'props': {'Address': mac_address}}
+    try:
+        return BLEDevice(mac_address, None, details)
+    except TypeError:
+        # bleak < 1.0 still requires the (deprecated) rssi argument
+        return BLEDevice(mac_address, None, details, -127)
+
 class Device:
-    def __init__(self, mac_address, on_resolved, on_data, on_connect_fail, notify_uuid, write_uuid):
+    def __init__(self, mac_address, on_resolved, on_data, on_connect_fail, notify_uuid, write_uuid, adapter=None,
+                 ble_device=None, notify_handle=None, write_handle=None):
         self.mac_address = mac_address
+        self.adapter = adapter
+        self.ble_device = ble_device
+        self.notify_handle = notify_handle
+        self.write_handle = write_handle
         self.on_data = on_data
         self.on_resolved = on_resolved
         self.on_connect_fail = on_connect_fail
         self.notify_uuid = notify_uuid
         self.write_uuid = write_uuid
-        self.client = BleakClient(mac_address)
+        kwargs = {}
+        if adapter:
+            kwargs['adapter'] = adapter
+        # A BLEDevice (from a scan, Home Assistant or known_bluez_device) spares bleak its own lookup scan
+        self.client = BleakClient(ble_device or mac_address, **kwargs)
         self.writing = None
+        self.mtu_size = DEFAULT_MTU
 
-    async def connect(self):
+    async def connect(self, report_failure=True):
+        """Connect and subscribe; returns True on success. Cached GATT handles are used when given."""
         try:
             await self.client.connect()
             _LOGGER.info("[%s] Connected", self.mac_address)
-            await self.client.start_notify(self.notify_uuid, self._handle_notification)
-            _LOGGER.info("[%s] Subscribed to notification %s", self.mac_address, self.notify_uuid)
+            await self._negotiate_mtu()
+            await self.client.start_notify(self.notify_handle or self.notify_uuid, self._handle_notification)
+            _LOGGER.info("[%s] Subscribed to notification %s", self.mac_address, self.notify_handle or self.notify_uuid)
+            self._resolve_handles()
             self.on_resolved()
+            return True
         except Exception as e:
             logging.error("Connection failed: %s", e)
-            self.on_connect_fail(e)
+            if report_failure:
+                self.on_connect_fail(e)
+            return False
+
+    async def _negotiate_mtu(self):
+        # BlueZ only exchanges a larger MTU on request; other backends negotiate it while connecting
+        acquire_mtu = getattr(getattr(self.client, '_backend', None), '_acquire_mtu', None)
+        if acquire_mtu is not None:
+            try:
+                await acquire_mtu()
+            except Exception as e:
+                _LOGGER.debug("[%s] MTU exchange not supported: %s", self.mac_address, e)
+        self.mtu_size = self.client.mtu_size or DEFAULT_MTU
+        _LOGGER.info("[%s] Negotiated MTU: %s", self.mac_address, self.mtu_size)
+
+    def _resolve_handles(self):
+        services = self.client.services
+        if self.notify_handle is None and self.notify_uuid:
+            char = services.get_characteristic(self.notify_uuid)
+            self.notify_handle = char.handle if char else None
+        if self.write_handle is None and self.write_uuid:
+            char = services.get_characteristic(self.write_uuid)
+            self.write_handle = char.handle if char else None
+
+    def connection_info(self):
+        """What is needed to reconnect without discovery next time."""
+        return {
+            'adapter': self.adapter,
+            'path': self._bluez_path(),
+            'notify_handle': self.notify_handle,
+            'write_handle': self.write_handle,
+        }
+
+    def _bluez_path(self):
+        details = getattr(self.ble_device, 'details', None)
+        return details.get('path') if isinstance(details, dict) else None
+
+    @property
+    def is_connected(self):
+        return self.client.is_connected
 
     async def disconnect(self):
         if self.client.is_connected:
@@ -50,14 +123,16 @@ class Device:
             _LOGGER.info("[%s] Disconnected", self.mac_address)
 
     def _handle_notification(self, sender, data):
-        self.on_data(bytearray(data))
+        result = self.on_data(bytearray(data))
+        if asyncio.iscoroutine(result):
+            asyncio.ensure_future(result)
 
     async def characteristic_write_value(self, value):
         if not self.write_uuid:
             logging.warning("Attempted write but write_uuid is empty.")
             return
         try:
-            await self.client.write_gatt_char(self.write_uuid, bytearray(value), response=True)
+            await self.client.write_gatt_char(self.write_handle or self.write_uuid, bytearray(value), response=True)
             _LOGGER.debug("Write characteristic not set; skipping write attempt")
         except Exception as e:
             logging.error("Write failed: %s", e)
@@ -21,7 +21,10 @@ import configparser
 import logging
 import traceback
 from .Utils import bytes_to_int, crc16_modbus, int_to_bytes
-from .BLE import DeviceManager, Device
+from .BLE import DeviceManager
+from .Transport import create_transport, TRANSPORT_BLE
+from .Settings import ClientSettings
+from .Scheduler import get_scheduler
 _LOGGER = logging.getLogger(__name__)
 # Base class that works with all Renogy family devices
 # Should be extended by each client with its own parsers and section definitions
@@ -44,46 +47,68 @@ class BaseClient:
         self.device_id = self.config['device'].getint('device_id')
         self.sections = []
         self.section_index = 0
+        self.settings = ClientSettings.from_config(self.config['device'])
         self.loop = self._get_or_create_event_loop()  # Ensure the event loop is assigned here
-        _LOGGER.info(f"Init {self.__class__.__name__}: {self.config['device']['alias']} => {self.config['device']['mac_addr']}")
+        self.scheduler = get_scheduler(self.loop)
+        _LOGGER.info(f"Init {self.__class__.__name__}: {self.config['device']['alias']} => {self.config['device'].get('mac_addr', self.config['device'].get('transport'))}")
         
     async def run(self):
-        """Continuously discover, connect, and poll data every 10 seconds."""
+        """Continuously discover, connect, and poll data every poll_interval seconds."""
         while True:
             try:
-                self.manager = DeviceManager(
-                    mac_address=self.config['device']['mac_addr'],
-                    alias=self.config['device']['alias'],
-                    adapter=self.config['device'].get('adapter', 'hci0')
-                )
-                await self.manager.discover()
-                if not self.manager.device_found:
-                    _LOGGER.warning("Device not found: %s", self.config['device']['mac_addr'])
+                if not await self._discover():
                     await asyncio.sleep(10)
                     continue
 
-                self.device = Device(
-                    mac_address=self.config['device']['mac_addr'],
-                    on_resolved=self.__on_resolved,
-                    on_data=self.on_data_received,
-                    on_connect_fail=self.__on_connect_fail,
-                    notify_uuid=NOTIFY_CHAR_UUID,
-                    write_uuid=WRITE_CHAR_UUID
-                )
+                self.device = self._create_transport()
                 await self.device.connect()
 
                 # Initial read
                 await self.read_section()
 
-                # Loop and poll every 10 seconds
+                # Poll on the shared scheduler every poll_interval seconds (live tunable via apply_settings)
+                self.poll_timer = self.scheduler.call_every(
+                    self.settings.poll_interval, name=f"poll:{self.config['device']['alias']}"
+                )
                 while True:
-                    await asyncio.sleep(10)
+                    await self.poll_timer.wait()
                     await self.read_section()
             except Exception as e:
                 _LOGGER.error(f"[RUN LOOP] Exception: {e}")
+                if self.poll_timer:
+                    self.poll_timer.cancel()
+                    self.poll_timer = None
                 await self.disconnect()
                 await asyncio.sleep(10)
                 
+    def apply_settings(self, settings):
+        self.settings = settings
+        if self.poll_timer:
+            self.poll_timer.set_interval(settings.poll_interval)
+
+    async def _discover(self):
+        # Wired transports (serial, tcp) are addressed directly, only BLE needs a scan
+        dev = self.config['device']
+        if dev.get('transport', TRANSPORT_BLE) != TRANSPORT_BLE:
+            return True
+        self.manager = DeviceManager(mac_address=dev['mac_addr'], alias=dev['alias'], adapter=dev.get('adapter', 'hci0'))
+        await self.manager.discover()
+        if not self.manager.device_found:
+            logging.error(f"Device not found: {dev['alias']} => {dev['mac_addr']}")
+        return self.manager.device_found
+
+    def _create_transport(self):
+        return create_transport(
+            self.config['device'],
+            on_resolved=self.__on_resolved,
+            on_data=self.on_data_received,
+            on_connect_fail=self.__on_connect_fail,
+            notify_uuid=NOTIFY_CHAR_UUID,
+            write_uuid=WRITE_CHAR_UUID,
+            adapter=self.config['device'].get('adapter', 'hci0'),
+            ble_device=self.manager.device_info if getattr(self, 'manager', None) else None
+        )
+
     def _get_or_create_event_loop(self):
         try:
             return asyncio.get_running_loop()
@@ -100,19 +125,9 @@ class BaseClient:
             self.__on_error(e)
 
     async def connect(self):
-        self.manager = DeviceManager(mac_address=self.config['device']['mac_addr'], alias=self.config['device']['alias'])
-        await self.manager.discover()
-        if not self.manager.device_found:
-            logging.error(f"Device not found: {self.config['device']['alias']} => {self.config['device']['mac_addr']}")
+        if not await self._discover():
             return
-        self.device = Device(
-            mac_address=self.config['device']['mac_addr'],
-            on_resolved=self.__on_resolved,
-            on_data=self.on_data_received,
-            on_connect_fail=self.__on_connect_fail,
-            notify_uuid=NOTIFY_CHAR_UUID,
-            write_uuid=WRITE_CHAR_UUID
-        )
+        self.device = self._create_transport()
         await self.device.connect()
 
     async def disconnect(self):
@@ -157,7 +172,7 @@ class BaseClient:
 
     async def check_polling(self):
         if self.config.get('data', {}).get('enable_polling', False):
-            await asyncio.sleep(self.config['data'].getint('poll_interval'))
+            await self.scheduler.sleep(self.config['data'].getint('poll_interval'), name=f"poll:{self.config['device']['alias']}")
             await self.read_section()
 
     async def read_section(self):
@@ -168,7 +183,7 @@ class BaseClient:
         if self.device_id is None or len(self.sections) == 0:
             return logging.error("BaseClient cannot be used directly")
 
-        self.read_timeout = self.loop.call_later(READ_TIMEOUT, self.on_read_timeout)
+        self.read_timeout = self.scheduler.call_later(READ_TIMEOUT, self.on_read_timeout, name=f"read_timeout:{self.config['device']['alias']}")
         request = self.create_generic_read_request(self.device_id, 3, self.sections[index]['register'], self.sections[index]['words'])
         await self.device.characteristic_write_value(request)
 
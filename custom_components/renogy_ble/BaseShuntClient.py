@@ -6,9 +6,13 @@ import logging
 import configparser
 import asyncio
 from .Utils import bytes_to_int, int_to_bytes, crc16_modbus
-from .BLE import DeviceManager, Device
-from bleak import BleakClient
+from .BLE import DeviceManager, known_bluez_device
+from .Transport import create_transport, TRANSPORT_BLE
 from .BaseClient import BaseClient
+from .Settings import ClientSettings
+from .Scheduler import get_scheduler
+from .Watchdog import StallWatchdog
+from .IngestQueue import IngestQueue, DEFAULT_MAXSIZE, POLICY_DROP_OLDEST
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,6 +23,13 @@ WRITE_CHAR_UUID  = ""
 READ_TIMEOUT = 30
 RECONNECT_DELAY = 5
 MAX_RECONNECT_ATTEMPTS = 15
+# Byte offsets that change between otherwise identical frames (rolling counters); masked before the
+# duplicate check. Empty: no rolling counter has been observed in shunt notifications.
+FRAME_VOLATILE_OFFSETS = ()
+FRAME_LENGTH = 73
+FRAME_HEADER_BYTE = 0x57
+ATT_HEADER_SIZE = 3
+MAX_RX_BUFFER = 4 * FRAME_LENGTH
 class BaseShuntClient(BaseClient):
     def __init__(self, config):
         self.config = config
@@ -26,68 +37,204 @@ class BaseShuntClient(BaseClient):
         self.device_id = int(dev['device_id'])
         self.alias = dev['alias']
         self.mac = dev.get('mac_addr', dev.get('mac'))
-        self.adapter = dev.get('adapter', 'hci0')
+        self.settings = ClientSettings.from_config(dev)
+        self.adapter = self.settings.adapter
+        self.transport_type = dev.get('transport', TRANSPORT_BLE)
         self.sections = []
         self.section_index = 0
         self.data = {}
         self.loop = asyncio.get_event_loop()
+        self.scheduler = get_scheduler(self.loop)
         self.read_timeout_task = None
         self.reconnect_attempts = 0
         self.manager = None
         self.device = None
+        self.ingest_queue = IngestQueue(
+            maxsize=int(dev.get('queue_size', DEFAULT_MAXSIZE)),
+            policy=dev.get('queue_policy', POLICY_DROP_OLDEST),
+            name=self.alias
+        )
+        self._ingest_task = None
+        self._run_task = None
+        self.watchdog = StallWatchdog(self.scheduler, self.alias, self._on_stall, self.settings.stall_multiple)
+        self._recovering = False
+        self.connection_cache = None
+        self.on_connection_cached = None
+        self.ble_device_resolver = None # callable(mac, adapter) -> BLEDevice or None, e.g. from HA's bluetooth
+        self.on_sample_callback = None
         _LOGGER.info(f"Init {self.__class__.__name__}: {self.alias} => {self.mac}")
         self._last_log_time = 0
+        self._published = {}
+        self.suppress_duplicates = True
+        self._last_frame = None
+        self.duplicate_frames = 0
+        self.accepted_frames = 0
+        self.reassemble = False
+        self._rx_buffer = bytearray()
+        self.notifications_received = 0
+        self.frames_completed = 0
+        self.bytes_discarded = 0
+        self.frames_rejected = 0
+        self.last_frame_time = None
 
     async def run(self):
-        """Notification-only mode: connect once and then wait for notifications indefinitely."""
+        """Notification-only mode: connect once; the ingest task then processes the received frames."""
+        if self._ingest_task is None or self._ingest_task.done():
+            self._ingest_task = self.loop.create_task(self._process_ingest_queue())
         await self.connect()
-        # Keep the task alive so notifications continue to be processed
-        while True:
-            await asyncio.sleep(60)
+        if self.transport_type == TRANSPORT_BLE:
+            self.watchdog.start()
 
     def start(self):
         """Begin notification-only client."""
-        asyncio.ensure_future(self.run())
+        self._run_task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        """Stop the client for good: cancel its tasks and disconnect."""
+        for task in (self._run_task, self._ingest_task):
+            if task and not task.done():
+                task.cancel()
+        self._run_task = self._ingest_task = None
+        self.watchdog.stop()
+        self.loop.create_task(self.disconnect())
+
+    def _on_stall(self):
+        # Connected but silent: report it (entities go unavailable) and bounce the link
+        self.__safe_callback(self.on_error_callback, f"No notifications for {self.watchdog.timeout:.0f}s")
+        self._reset_publish_state()
+        if not self._recovering:
+            self.loop.create_task(self._recover_stall())
+
+    async def _recover_stall(self):
+        self._recovering = True
+        try:
+            if self.device is None:
+                await self.connect()
+            else:
+                await self.device.disconnect()
+                await self.device.connect()
+        except Exception as e:
+            _LOGGER.error(f"[{self.alias}] Stall recovery failed: {e}")
+        finally:
+            self._recovering = False
 
     async def connect(self):
-        self.manager = DeviceManager(mac_address=self.mac, alias=self.alias, adapter=self.adapter)
-        await self.manager.discover()
+        if self.transport_type != TRANSPORT_BLE:
+            # Wired links are request/response only; the shunt pushes its frames as BLE notifications
+            _LOGGER.warning(f"[{self.alias}] The shunt only streams readings over BLE; "
+                            f"transport '{self.transport_type}' is meant for polled Modbus devices")
+            self.device = self._create_transport()
+            await self.device.connect()
+            return
 
-        if not self.manager.device_found:
-            _LOGGER.error(f"Device not found: {self.alias} => {self.mac}")
-            return await self.__stop_service()
+        # Warm start: skip discovery when we know how we connected last time
+        if self.connection_cache and await self._connect_from_cache():
+            return
 
-        self.device = Device(
-            mac_address=self.mac,
-            on_resolved=self.__on_resolved,
-            on_data=self.on_data_received,
-            on_connect_fail=self.__on_connect_fail,
-            notify_uuid=NOTIFY_CHAR_UUID,
-            write_uuid=WRITE_CHAR_UUID
-        )
+        ble_device = self.ble_device_resolver(self.mac, self.adapter) if self.ble_device_resolver else None
+        if ble_device is None:
+            self.manager = DeviceManager(mac_address=self.mac, alias=self.alias, adapter=self.adapter)
+            await self.manager.discover()
+
+            if not self.manager.device_found:
+                _LOGGER.error(f"Device not found: {self.alias} => {self.mac}")
+                return await self.__stop_service()
+            ble_device = self.manager.device_info
+
+        self.device = self._create_transport(ble_device=ble_device)
 
         while self.reconnect_attempts < MAX_RECONNECT_ATTEMPTS:
             try:
                 _LOGGER.info(f"Connecting (attempt {self.reconnect_attempts+1})...")
-                await self.device.connect()
+                connected = await self.device.connect()
                 self.reconnect_attempts = 0
-                _LOGGER.info("Connected successfully")
+                if connected:
+                    _LOGGER.info("Connected successfully")
+                    self.__safe_callback(self.on_connection_cached, self.device.connection_info())
                 return
             except Exception as e:
                 self.reconnect_attempts += 1
                 logging.warning(f"Connect failed: {e}, retrying in {RECONNECT_DELAY}s")
-                await asyncio.sleep(RECONNECT_DELAY)
+                await self.scheduler.sleep(RECONNECT_DELAY, name=f"reconnect:{self.alias}")
 
         logging.error("Max reconnect attempts reached.")
         await self.__on_error(True, "Max reconnect attempts reached.")
 
+    async def _connect_from_cache(self):
+        cache = self.connection_cache
+        if cache.get('adapter') != self.adapter:
+            return False
+        ble_device = self.ble_device_resolver(self.mac, self.adapter) if self.ble_device_resolver else None
+        if ble_device is None:
+            # No advertisement seen yet (cold start): go straight to the device object BlueZ keeps
+            ble_device = known_bluez_device(self.mac, cache.get('adapter'), cache.get('path'))
+        if ble_device is None:
+            return False
+        _LOGGER.info(f"[{self.alias}] Connecting from cache, skipping discovery")
+        self.device = self._create_transport(
+            ble_device=ble_device,
+            notify_handle=cache.get('notify_handle'),
+            write_handle=cache.get('write_handle')
+        )
+        if await self.device.connect(report_failure=False):
+            return True
+        _LOGGER.info(f"[{self.alias}] Cached connection failed; falling back to discovery")
+        self.connection_cache = None
+        await self.device.disconnect()
+        return False
+
+    def _create_transport(self, **ble_kwargs):
+        if self.transport_type == TRANSPORT_BLE:
+            ble_kwargs['adapter'] = self.adapter
+        else:
+            ble_kwargs = {}
+        return create_transport(
+            self.config.get('device', self.config),
+            on_resolved=self.__on_resolved,
+            on_data=self._enqueue_notification,
+            on_connect_fail=self.__on_connect_fail,
+            notify_uuid=NOTIFY_CHAR_UUID,
+            write_uuid=WRITE_CHAR_UUID,
+            **ble_kwargs
+        )
+
     async def disconnect(self):
         if self.device:
             await self.device.disconnect()
         await self.__stop_service()
 
+    async def reconnect(self):
+        await self.disconnect()
+        self.reconnect_attempts = 0
+        await self.connect()
+
+    def apply_settings(self, settings):
+        """Swap in new runtime settings without restarting the client."""
+        adapter_changed = settings.adapter != self.adapter
+        self.settings = settings
+        self._published = {}
+        self._last_frame = None
+        self.watchdog.multiple = settings.stall_multiple
+        if adapter_changed:
+            _LOGGER.info(f"[{self.alias}] Adapter changed {self.adapter} => {settings.adapter}, reconnecting")
+            self.adapter = settings.adapter
+            self.loop.create_task(self.reconnect())
+
+    def _reset_publish_state(self):
+        # The next frame is decoded and published in full even if it matches the last one, so
+        # entities marked unavailable (stall, reconnect) come back while readings are steady
+        self._last_frame = None
+        self._published = {}
+        self._last_log_time = 0
+
     def __on_resolved(self):
         _LOGGER.info("Services resolved; listening for notifications")
+        # A frame that doesn't fit in one notification payload arrives in pieces
+        payload = self.device.mtu_size - ATT_HEADER_SIZE
+        self.reassemble = payload < FRAME_LENGTH
+        self._rx_buffer.clear()
+        self._reset_publish_state()
+        _LOGGER.info(f"[{self.alias}] MTU {self.device.mtu_size}: {'fragment reassembly' if self.reassemble else 'single notification'} mode")
         # No manual read or polling required; rely on BLE notifications
 
     # Manual read_section logic is not needed with notification-only mode.
@@ -97,14 +244,130 @@ class BaseShuntClient(BaseClient):
     # async def on_read_timeout(self):
     #     pass
 
+    def _enqueue_notification(self, response):
+        # Runs inside the Bleak callback. Framing happens here, before the lossy queue, so a dropped
+        # or coalesced entry is always a whole frame and never splices two frames together
+        self.watchdog.feed()
+        for frame in self._split_frames(response):
+            self.ingest_queue.put_nowait(frame)
+
+    async def _process_ingest_queue(self):
+        while True:
+            response = await self.ingest_queue.get()
+            try:
+                self.on_data_received(response)
+            except Exception as e:
+                _LOGGER.error(f"Exception while processing notification: {e}")
+            finally:
+                self.ingest_queue.task_done()
+
     def on_data_received(self, response):
         if self.read_timeout_task and not self.read_timeout_task.cancelled():
             self.read_timeout_task.cancel()
+        self._process_frame(response)
 
-        response = self._realign_packet(response)
-        if not response:
-            _LOGGER.warning("Could not realign packet; skipping.")
-            return
+    def _split_frames(self, response):
+        """Whole, validated frames contained in (or completed by) one notification."""
+        self.notifications_received += 1
+        if not self.reassemble:
+            frame = self._realign_packet(response)
+            if frame:
+                return self._validate_frames([frame])
+            if len(response) >= FRAME_LENGTH:
+                _LOGGER.warning("Could not realign packet; skipping.")
+                return []
+            # Short notification: the link is fragmenting frames after all
+            _LOGGER.info(f"[{self.alias}] Received {len(response)} byte notification, switching to fragment reassembly")
+            self.reassemble = True
+        return self._validate_frames(self._reassemble(response))
+
+    def _validate_frames(self, frames):
+        # The frame carries no checksum (its last bytes are the second temperature probe), so
+        # only its shape can be checked; splices from lost fragments are caught in _reassemble
+        valid = []
+        for frame in frames:
+            if len(frame) != FRAME_LENGTH or frame[1] != FRAME_HEADER_BYTE:
+                self.frames_rejected += 1
+                continue
+            valid.append(frame)
+        self.frames_completed += len(valid)
+        return valid
+
+    def _reassemble(self, fragment):
+        buffer = self._rx_buffer
+        # Frames start at a notification boundary: a new frame header while a frame is still
+        # incomplete means a fragment of that frame was lost, so it must not be completed from this one
+        if (2 <= len(buffer) < FRAME_LENGTH and buffer[1] == FRAME_HEADER_BYTE
+                and fragment[:2] == bytes((buffer[0], FRAME_HEADER_BYTE))):
+            _LOGGER.debug(f"[{self.alias}] Discarding incomplete frame ({len(buffer)} bytes), fragment lost")
+            self.frames_rejected += 1
+            self.bytes_discarded += len(buffer)
+            buffer.clear()
+        buffer.extend(fragment)
+        frames = []
+        while True:
+            # The header byte sits at offset 1, after the device address
+            start = buffer.find(FRAME_HEADER_BYTE, 1) - 1
+            if start < 0:
+                # Keep the last byte, it may be the address of a frame whose header is still in flight
+                self.bytes_discarded += max(0, len(buffer) - 1)
+                del buffer[:-1]
+                break
+            if start > 0:
+                self.bytes_discarded += start
+                del buffer[:start]
+            if len(buffer) < FRAME_LENGTH:
+                break
+            frames.append(bytearray(buffer[:FRAME_LENGTH]))
+            del buffer[:FRAME_LENGTH]
+        if len(buffer) > MAX_RX_BUFFER:
+            self.bytes_discarded += len(buffer)
+            buffer.clear()
+        return frames
+
+    def snapshot(self):
+        """Latest decoded sample plus health counters, for bulk readers."""
+        watchdog = self.watchdog.stats()
+        watchdog.pop('silent_for', None)
+        return {
+            'alias': self.alias,
+            'mac': self.mac,
+            'timestamp': self.last_frame_time,
+            'data': dict(self.data),
+            'health': {
+                'connected': bool(self.device and self.device.is_connected),
+                'queue': self.ingest_queue.stats(),
+                'receive': self.receive_stats(),
+                'watchdog': watchdog,
+            },
+        }
+
+    def receive_stats(self):
+        return {
+            'mtu': self.device.mtu_size if self.device else None,
+            'mode': 'reassembly' if self.reassemble else 'single',
+            'notifications': self.notifications_received,
+            'frames': self.frames_completed,
+            'frames_per_notification': round(self.frames_completed / self.notifications_received, 3) if self.notifications_received else 0,
+            'bytes_discarded': self.bytes_discarded,
+            'rejected': self.frames_rejected,
+            'duplicates': self.duplicate_frames,
+        }
+
+    def _process_frame(self, response):
+        # A duplicate still confirms the current readings, so it refreshes the sample time
+        self.last_frame_time = time.time()
+
+        # Fast path: a frame identical to the last accepted one carries no new readings, so it skips
+        # decoding and publishing; sample consumers still get one sample per frame from the cached values
+        if self.suppress_duplicates:
+            frame = self._frame_key(response)
+            if frame == self._last_frame:
+                self.duplicate_frames += 1
+                self.__safe_callback(self.on_sample_callback, self.data)
+                return
+            self._last_frame = frame
+        self.accepted_frames += 1
 
         operation = bytes_to_int(response, 1, 1)
         if operation == 87:
@@ -114,13 +377,26 @@ class BaseShuntClient(BaseClient):
                     parsed = parser(response)
                     if isinstance(parsed, dict):
                         self.data.update(parsed)
+            # Every decoded frame goes to the sample consumer (e.g. exporter), unthrottled
+            self.__safe_callback(self.on_sample_callback, self.data)
             current_time = time.time()
-            if current_time - self._last_log_time >= 10:
+            if current_time - self._last_log_time >= self.settings.aggregation_window:
                 self._last_log_time = current_time
-                self.__safe_callback(self.on_data_callback, self.data)
+                publish = self.settings.select(self.data, self._published)
+                if publish:
+                    self.__safe_callback(self.on_data_callback, publish)
         else:
             _LOGGER.warning(f"Unknown operation={operation}")
 
+    def _frame_key(self, frame):
+        if not FRAME_VOLATILE_OFFSETS:
+            return bytes(frame)
+        masked = bytearray(frame)
+        for offset in FRAME_VOLATILE_OFFSETS:
+            if offset < len(masked):
+                masked[offset] = 0
+        return bytes(masked)
+
     def _realign_packet(self, buffer):
         MIN_LENGTH = 73
         HEADER_BYTE = 0x57
@@ -0,0 +1,43 @@
+import json
+import logging
+import os
+_LOGGER = logging.getLogger(__name__)
+# File-backed connection cache for the headless worker and CLI (Home Assistant uses device_cache.py).
+# Holds the last working adapter, BlueZ device path and GATT handles per MAC, so a restart can
+# connect straight away instead of scanning first.
+
+class FileConnectionCache:
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        try:
+            with open(path) as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"Ignoring unreadable connection cache {path}: {e}")
+
+    def get(self, mac):
+        return self.data.get(mac.upper())
+
+    def update(self, mac, info):
+        if self.data.get(mac.upper()) == info:
+            return
+        self.data[mac.upper()] = info
+        # Write-then-rename so a crash never leaves a truncated cache behind
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            _LOGGER.warning(f"Could not write connection cache {self.path}: {e}")
+
+    def attach(self, client):
+        """Warm-start a client from the cache and keep its entry up to date."""
+        client.connection_cache = self.get(client.mac)
+        client.on_connection_cached = lambda c, info: self.update(c.mac, info)
+
+def default_cache_path(config_path):
+    return os.path.splitext(config_path)[0] + '.cache.json'
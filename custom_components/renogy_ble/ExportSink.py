@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+_LOGGER = logging.getLogger(__name__)
+# Batched time-series export of decoded samples as InfluxDB line protocol.
+# Samples from every client are buffered and flushed when either the batch size or the
+# flush interval is reached. Failed batches are kept in a bounded on-disk spool and replayed
+# in front of the next successful flush.
+# Targets: file:///path/to/file.lp, udp://host:port, tcp://host:port, mqtt://host:port/topic
+
+# Try to import paho only when exporting to MQTT
+try:
+    import paho.mqtt.publish as mqtt_publish
+except ImportError:
+    mqtt_publish = None
+
+DEFAULT_MEASUREMENT = 'renogy'
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 10 # (seconds)
+DEFAULT_SPOOL_MAX_BYTES = 5 * 1024 * 1024
+UDP_MAX_PAYLOAD = 1400
+SEND_TIMEOUT = 10 # (seconds) connect/drain limit so a black-holed sink can't hold the flush lock
+BUFFER_BATCHES = 4 # in-memory buffer cap, in batches; beyond it samples spill to the spool
+
+def _escape_key(value):
+    return str(value).replace('\\', '\\\\').replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+def _format_field(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return f"{value}i"
+    if isinstance(value, float):
+        return repr(value)
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def to_line_protocol(measurement, tags, fields, timestamp_ns):
+    fields_str = ','.join(
+        f"{_escape_key(k)}={_format_field(v)}"
+        for k, v in fields.items()
+        if v is not None and not k.startswith('__')
+    )
+    if not fields_str:
+        return None
+    tags_str = ''.join(f",{_escape_key(k)}={_escape_key(v)}" for k, v in sorted(tags.items()) if v not in (None, ''))
+    return f"{_escape_key(measurement)}{tags_str} {fields_str} {timestamp_ns}"
+
+class LineProtocolExporter:
+    def __init__(self, target, measurement=DEFAULT_MEASUREMENT, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, spool_path=None, spool_max_bytes=DEFAULT_SPOOL_MAX_BYTES):
+        self.target = target
+        self.url = urlparse(target)
+        if self.url.scheme not in ('file', 'udp', 'tcp', 'mqtt'):
+            raise ValueError(f"Unsupported export target: {target}")
+        if self.url.scheme == 'mqtt' and mqtt_publish is None:
+            raise ValueError("MQTT export requires the paho-mqtt package")
+        self.measurement = measurement
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.spool_path = spool_path
+        self.spool_max_bytes = int(spool_max_bytes)
+        self.loop = None
+        self.buffer = []
+        self.flush_timer = None
+        self.flush_lock = asyncio.Lock()
+        self.spool_lock = threading.Lock()
+        self.max_buffered = self.batch_size * BUFFER_BATCHES
+        self._flush_pending = False
+        self.tcp_writer = None
+        self.exported = 0
+        self.spooled = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self, loop=None):
+        self.loop = loop or asyncio.get_event_loop()
+        self._arm_timer()
+        _LOGGER.info(f"Exporting samples to {self.target} (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def stop(self):
+        if self.flush_timer:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        await self.flush()
+        if self.tcp_writer:
+            self.tcp_writer.close()
+            self.tcp_writer = None
+
+    def add(self, tags, fields, timestamp=None):
+        """Buffer one decoded sample; never blocks the caller."""
+        line = to_line_protocol(self.measurement, tags, fields, int((timestamp or time.time()) * 1e9))
+        if line is None:
+            return
+        self.buffer.append(line)
+        if self.loop is None:
+            return
+        if len(self.buffer) >= self.max_buffered:
+            # The sink is not keeping up: spill to the spool instead of growing in memory
+            lines, self.buffer = self.buffer, []
+            self.loop.run_in_executor(None, self._write_spool, lines)
+        elif len(self.buffer) >= self.batch_size:
+            self._schedule_flush()
+
+    def stats(self):
+        return {
+            'buffered': len(self.buffer),
+            'exported': self.exported,
+            'spooled': self.spooled,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
+    def _arm_timer(self):
+        self.flush_timer = self.loop.call_later(self.flush_interval, self._on_flush_timer)
+
+    def _on_flush_timer(self):
+        self._schedule_flush()
+        self._arm_timer()
+
+    def _schedule_flush(self):
+        # At most one flush waits for the lock; it picks up everything buffered meanwhile
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.loop.create_task(self.flush())
+
+    async def flush(self):
+        async with self.flush_lock:
+            self._flush_pending = False
+            if not self.buffer and not self._has_spool():
+                return
+            lines, self.buffer = self.buffer, []
+            pending = await self.loop.run_in_executor(None, self._take_spool)
+            try:
+                if pending:
+                    await self._send(pending)
+                    self.exported += len(pending)
+                    pending = []
+                if lines:
+                    await self._send(lines)
+                    self.exported += len(lines)
+            except Exception as e:
+                self.errors += 1
+                _LOGGER.warning(f"Export to {self.target} failed: {e or type(e).__name__}; spooling {len(pending) + len(lines)} samples")
+                if self.tcp_writer:
+                    self.tcp_writer.close()
+                    self.tcp_writer = None
+                if pending:
+                    await self.loop.run_in_executor(None, self._write_spool, pending)
+                if lines:
+                    await self.loop.run_in_executor(None, self._write_spool, lines)
+
+    async def _send(self, lines):
+        payload = ('\n'.join(lines) + '\n').encode()
+        scheme = self.url.scheme
+        if scheme == 'file':
+            await self.loop.run_in_executor(None, self._send_file, payload)
+        elif scheme == 'udp':
+            await self.loop.run_in_executor(None, self._send_udp, lines)
+        elif scheme == 'tcp':
+            if self.tcp_writer is None:
+                _, self.tcp_writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.url.hostname, self.url.port), SEND_TIMEOUT)
+            self.tcp_writer.write(payload)
+            await asyncio.wait_for(self.tcp_writer.drain(), SEND_TIMEOUT)
+        elif scheme == 'mqtt':
+            await self.loop.run_in_executor(None, self._send_mqtt, payload)
+
+    def _send_file(self, payload):
+        with open(self.url.path, 'ab') as f:
+            f.write(payload)
+
+    def _send_udp(self, lines):
+        # Keep every datagram under a typical MTU, splitting on line boundaries
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            chunk = b''
+            for line in lines:
+                data = line.encode() + b'\n'
+                if chunk and len(chunk) + len(data) > UDP_MAX_PAYLOAD:
+                    sock.sendto(chunk, (self.url.hostname, self.url.port))
+                    chunk = b''
+                chunk += data
+            if chunk:
+                sock.sendto(chunk, (self.url.hostname, self.url.port))
+
+    def _send_mqtt(self, payload):
+        topic = self.url.path.lstrip('/') or self.measurement
+        auth = {'username': self.url.username, 'password': self.url.password} if self.url.username else None
+        mqtt_publish.single(topic, payload, hostname=self.url.hostname, port=self.url.port or 1883, auth=auth)
+
+    def _has_spool(self):
+        return bool(self.spool_path) and os.path.exists(self.spool_path)
+
+    def _take_spool(self):
+        # Read and remove in one step so a concurrent spill isn't deleted unsent
+        with self.spool_lock:
+            if not self._has_spool():
+                return []
+            with open(self.spool_path, 'r') as f:
+                lines = [line for line in f.read().splitlines() if line]
+            os.remove(self.spool_path)
+            return lines
+
+    def _write_spool(self, lines):
+        if not self.spool_path:
+            self.dropped += len(lines)
+            return
+        with self.spool_lock:
+            size = os.path.getsize(self.spool_path) if os.path.exists(self.spool_path) else 0
+            payload = ('\n'.join(lines) + '\n').encode()
+            if size + len(payload) > self.spool_max_bytes:
+                _LOGGER.warning(f"Export spool full ({size} bytes); dropping {len(lines)} samples")
+                self.dropped += len(lines)
+                return
+            with open(self.spool_path, 'ab') as f:
+                f.write(payload)
+            self.spooled += len(lines)
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+_LOGGER = logging.getLogger(__name__)
+# Bounded queue sitting between the BLE notification callback and the frame processing stage.
+# The callback only ever calls put_nowait(), so a slow consumer can never back up into Bleak.
+
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_COALESCE = 'coalesce'
+POLICIES = (POLICY_DROP_OLDEST, POLICY_COALESCE)
+DEFAULT_MAXSIZE = 32
+
+class IngestQueue:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, policy=POLICY_DROP_OLDEST, name=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown ingest queue policy: {policy}")
+        self.name = name
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize=max(1, int(maxsize)))
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    def put_nowait(self, item):
+        """Enqueue an item without blocking, applying the overflow policy when full."""
+        self.received += 1
+        if self.queue.full():
+            if self.policy == POLICY_COALESCE:
+                # keep only the latest item, everything still pending is superseded
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.coalesced += 1
+            else:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+            _LOGGER.debug(f"[{self.name}] ingest queue full, policy={self.policy}")
+        self.queue.put_nowait(item)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    async def get(self):
+        return await self.queue.get()
+
+    def task_done(self):
+        self.processed += 1
+        self.queue.task_done()
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'maxsize': self.queue.maxsize,
+            'policy': self.policy,
+            'received': self.received,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
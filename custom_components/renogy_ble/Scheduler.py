@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import weakref
+_LOGGER = logging.getLogger(__name__)
+# One timer heap per event loop shared by every client: poll, timeout and heartbeat deadlines all
+# live here behind a single armed loop timer. Periodic deadlines are staggered so devices polling at
+# the same interval don't all hit the radio at once, and every firing records how late it ran.
+
+GOLDEN_RATIO = 0.6180339887 # spreads the n-th periodic job evenly over its interval
+
+class ScheduledCall:
+    def __init__(self, scheduler, when, callback, args, name):
+        self.scheduler = scheduler
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.name = name
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def cancelled(self):
+        return self._cancelled
+
+    def _run(self):
+        self.callback(*self.args)
+
+class PeriodicCall(ScheduledCall):
+    def __init__(self, scheduler, when, interval, callback, name):
+        super().__init__(scheduler, when, callback, (), name)
+        self.interval = interval
+        self._waiter = None
+
+    def set_interval(self, interval):
+        self.interval = interval
+
+    async def wait(self):
+        """Wait for the next tick of this periodic deadline."""
+        if self._waiter is None or self._waiter.done():
+            self._waiter = self.scheduler.loop.create_future()
+        await asyncio.shield(self._waiter)
+
+    def cancel(self):
+        super().cancel()
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.cancel()
+
+    def _run(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        try:
+            if self.callback is not None:
+                self.callback()
+        finally:
+            # Re-arm even if the callback raised. The next deadline follows the previous one (no drift)
+            # and skips ticks missed while we fell behind
+            now = self.scheduler.loop.time()
+            self.when += self.interval
+            if self.when <= now:
+                self.when += ((now - self.when) // self.interval + 1) * self.interval
+            if not self.cancelled():
+                self.scheduler._push(self)
+
+class Scheduler:
+    def __init__(self, loop=None):
+        self.loop = loop or asyncio.get_event_loop()
+        self._heap = []
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_when = None
+        self._periodic_count = 0
+        self.slip = {}
+
+    def call_at(self, when, callback, *args, name=None):
+        call = ScheduledCall(self, when, callback, args, name)
+        self._push(call)
+        return call
+
+    def call_later(self, delay, callback, *args, name=None):
+        return self.call_at(self.loop.time() + delay, callback, *args, name=name)
+
+    def call_every(self, interval, callback=None, name=None):
+        """Periodic deadline, phase-shifted against the other periodic deadlines on this scheduler."""
+        offset = (self._periodic_count * GOLDEN_RATIO % 1.0) * interval
+        self._periodic_count += 1
+        call = PeriodicCall(self, self.loop.time() + offset, interval, callback, name)
+        self._push(call)
+        return call
+
+    async def sleep(self, delay, name=None):
+        future = self.loop.create_future()
+        call = self.call_later(delay, lambda: future.done() or future.set_result(None), name=name)
+        try:
+            await future
+        finally:
+            call.cancel()
+
+    def stats(self):
+        return {
+            'pending': sum(1 for _, _, call in self._heap if not call.cancelled()),
+            'slip': {
+                name: {
+                    'count': s['count'],
+                    'avg_ms': round(s['total'] / s['count'] * 1000, 2),
+                    'max_ms': round(s['max'] * 1000, 2),
+                }
+                for name, s in self.slip.items()
+            },
+        }
+
+    def _push(self, call):
+        heapq.heappush(self._heap, (call.when, next(self._seq), call))
+        if self._timer_when is None or call.when < self._timer_when:
+            self._arm(call.when)
+
+    def _arm(self, when):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_when = when
+        self._timer = self.loop.call_at(when, self._fire)
+
+    def _fire(self):
+        self._timer = self._timer_when = None
+        now = self.loop.time()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            when, _, call = heapq.heappop(heap)
+            if call.cancelled():
+                continue
+            self._record_slip(call.name, now - when)
+            try:
+                call._run()
+            except Exception as e:
+                _LOGGER.error(f"Exception in scheduled call {call.name}: {e}")
+        # Drop cancelled entries sitting on top so the timer isn't armed for nothing
+        while heap and heap[0][2].cancelled():
+            heapq.heappop(heap)
+        if heap and self._timer_when != heap[0][0]:
+            self._arm(heap[0][0])
+
+    def _record_slip(self, name, slip):
+        key = name or 'unnamed'
+        s = self.slip.get(key)
+        if s is None:
+            s = self.slip[key] = {'count': 0, 'total': 0.0, 'max': 0.0}
+        s['count'] += 1
+        s['total'] += slip
+        s['max'] = max(s['max'], slip)
+
+_SCHEDULERS = weakref.WeakKeyDictionary()
+
+def get_scheduler(loop=None):
+    """The shared scheduler of a loop; every client on that loop uses the same heap."""
+    loop = loop or asyncio.get_event_loop()
+    scheduler = _SCHEDULERS.get(loop)
+    if scheduler is None:
+        scheduler = _SCHEDULERS[loop] = Scheduler(loop)
+    return scheduler
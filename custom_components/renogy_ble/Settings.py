@@ -0,0 +1,66 @@
+import logging
+from .Utils import parse_fields
+_LOGGER = logging.getLogger(__name__)
+# Runtime settings for a client, parsed once from config entry data/options (or YAML) so the
+# per-frame path only does set lookups and float compares.
+
+DEFAULT_POLL_INTERVAL = 10 # (seconds)
+DEFAULT_AGGREGATION_WINDOW = 10 # (seconds)
+DEFAULT_STALL_MULTIPLE = 5 # stall once silent for this many learned notification intervals
+
+def parse_deadbands(deadbands):
+    """Parse 'field:value, field:value' (or a dict) into {field: float}."""
+    if not deadbands:
+        return {}
+    if isinstance(deadbands, dict):
+        return {k: abs(float(v)) for k, v in deadbands.items()}
+    result = {}
+    for item in deadbands.split(','):
+        if not item.strip():
+            continue
+        key, sep, value = item.partition(':')
+        if not sep:
+            raise ValueError(f"Invalid deadband '{item.strip()}', expected field:value")
+        result[key.strip()] = abs(float(value))
+    return result
+
+class ClientSettings:
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL, aggregation_window=DEFAULT_AGGREGATION_WINDOW,
+                 deadbands=None, fields=None, adapter='hci0', stall_multiple=DEFAULT_STALL_MULTIPLE):
+        self.poll_interval = float(poll_interval)
+        self.aggregation_window = float(aggregation_window)
+        self.deadbands = parse_deadbands(deadbands)
+        self.fields = parse_fields(fields)
+        self.adapter = adapter
+        self.stall_multiple = float(stall_multiple)
+
+    @classmethod
+    def from_config(cls, data, options=None):
+        """Build settings from entry data overlaid with entry options."""
+        merged = dict(data or {})
+        merged.update(options or {})
+        return cls(
+            poll_interval=merged.get('poll_interval', DEFAULT_POLL_INTERVAL),
+            aggregation_window=merged.get('aggregation_window', DEFAULT_AGGREGATION_WINDOW),
+            deadbands=merged.get('deadbands'),
+            fields=merged.get('fields'),
+            adapter=merged.get('adapter', 'hci0'),
+            stall_multiple=merged.get('stall_multiple', DEFAULT_STALL_MULTIPLE),
+        )
+
+    def select(self, data, published):
+        """Return the subset of data worth publishing and record it in `published`."""
+        fields = self.fields
+        deadbands = self.deadbands
+        out = {}
+        for key, value in data.items():
+            if fields is not None and key not in fields:
+                continue
+            band = deadbands.get(key)
+            if band:
+                previous = published.get(key)
+                if previous is not None and isinstance(value, (int, float)) and abs(value - previous) < band:
+                    continue
+            out[key] = value
+        published.update(out)
+        return out
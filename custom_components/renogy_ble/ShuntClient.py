@@ -12,6 +12,32 @@ FUNCTION = {
     6: "WRITE"
 }
 
+# Field map of the shunt notification frame: name => (offset, length, scale, signed)
+# Only fields demanded by an enabled entity or a subscribed consumer are decoded, so adding an
+# entry here costs nothing for users who don't use it. New fields also need a wire id: append them to
+# WorkerProtocol.SAMPLE_FIELDS.
+SHUNT_FIELDS = {
+    'discharge_amps': (21, 3, 0.001, True),
+    'charge_battery_voltage': (25, 3, 0.001, False),
+    'starter_battery_voltage': (30, 2, 0.001, False),
+    'state_of_charge': (34, 2, 0.1, False),
+    'temperature_sensor_1': (66, 3, 0.001, False),
+    'temperature_sensor_2': (70, 3, 0.001, False),
+}
+
+# Fields computed from other fields: name => (dependencies, function)
+SHUNT_DERIVED_FIELDS = {
+    'discharge_watts': (
+        ('charge_battery_voltage', 'discharge_amps'),
+        lambda d: round(d['charge_battery_voltage'] * d['discharge_amps'], 2)
+    ),
+}
+
+# Temperature probes that aren't plugged in leave a 0 in their first byte and noise in the rest
+SHUNT_PROBE_FIELDS = frozenset(('temperature_sensor_1', 'temperature_sensor_2'))
+
+ALL_SHUNT_FIELDS = frozenset(SHUNT_FIELDS) | frozenset(SHUNT_DERIVED_FIELDS)
+
 
 class ShuntClient(BaseClient):
     def __init__(self, config, on_data_callback=None, on_error_callback=None):
@@ -29,6 +55,39 @@ class ShuntClient(BaseClient):
         self.sections = [
             {'register': 256, 'words': 110, 'parser': self.parse_shunt_info}
         ]
+        self.field_demand = None # None until a consumer registers: standalone use decodes everything
+        self._decode_plan = []
+        self._derived_plan = []
+        self._update_decode_plan()
+
+    def set_field_demand(self, consumer, fields):
+        """Register the fields a consumer (entity, exporter, ...) needs decoded."""
+        if self.field_demand is None:
+            self.field_demand = {}
+        self.field_demand[consumer] = frozenset(fields) & ALL_SHUNT_FIELDS
+        self._update_decode_plan()
+
+    def release_field_demand(self, consumer):
+        # Once consumers registered, releasing the last one means nothing is decoded, not everything
+        if self.field_demand and self.field_demand.pop(consumer, None) is not None:
+            self._update_decode_plan()
+
+    def _update_decode_plan(self):
+        # Until a consumer registers everything is decoded (standalone / legacy behaviour)
+        needed = ALL_SHUNT_FIELDS if self.field_demand is None else frozenset().union(*self.field_demand.values())
+        derived = [name for name in SHUNT_DERIVED_FIELDS if name in needed]
+        raw = set(name for name in needed if name in SHUNT_FIELDS)
+        for name in derived:
+            raw.update(SHUNT_DERIVED_FIELDS[name][0])
+        self._decode_plan = [(name,) + SHUNT_FIELDS[name] + (name in SHUNT_PROBE_FIELDS,) for name in SHUNT_FIELDS if name in raw]
+        self._derived_plan = [(name, SHUNT_DERIVED_FIELDS[name][1]) for name in derived]
+        decoded = raw.union(derived)
+        # The next frame must be decoded with the new plan even if its bytes didn't change
+        self._last_frame = None
+        # Drop values nobody decodes anymore so they are not republished stale
+        for key in [k for k in self.data if k in ALL_SHUNT_FIELDS and k not in decoded]:
+            del self.data[key]
+        _LOGGER.debug(f"[{self.alias}] decoding fields: {sorted(decoded)}")
 
     def on_data_received(self, response):
         operation = bytes_to_int(response, 1, 1)
@@ -50,11 +109,13 @@ class ShuntClient(BaseClient):
             return {}
 
         data = {}
-        data['charge_battery_voltage'] = bytes_to_int(bs, 25, 3, scale = 0.001)
-        data['starter_battery_voltage'] = bytes_to_int(bs, 30, 2, scale = 0.001)
-        data['discharge_amps'] = bytes_to_int(bs, 21, 3, scale = 0.001, signed=True)
-        data['discharge_watts'] = round((data['charge_battery_voltage'] * data['discharge_amps']), 2)
-        data['state_of_charge'] = bytes_to_int(bs, 34, 2, scale=0.1)
+        for name, offset, length, scale, signed, probe in self._decode_plan:
+            if probe and bs[offset] == 0:
+                data[name] = 0.0
+            else:
+                data[name] = bytes_to_int(bs, offset, length, scale=scale, signed=signed)
+        for name, func in self._derived_plan:
+            data[name] = func(data)
 
         self.data.update(data)
         return data
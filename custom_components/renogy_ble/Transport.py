@@ -0,0 +1,189 @@
+"""
+This file is part of renogy_ble.
+
+renogy_ble is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+renogy_ble is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with renogy_ble. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import logging
+from .Utils import crc16_modbus
+_LOGGER = logging.getLogger(__name__)
+# Transports carry the Renogy Modbus RTU frames between a client and a device.
+# Every transport exposes the interface of BLE.Device, which is the BLE implementation:
+#   connect() -> bool, disconnect(), characteristic_write_value(request), connection_info(), mtu_size
+# and reports received frames through on_data / successful connects through on_resolved.
+#
+# Wired transports speak plain Modbus RTU: over RS485 (serial) or through a Modbus RTU-over-TCP
+# gateway. Several devices (device_id) behind one port or gateway share a single pooled link.
+
+TRANSPORT_BLE = 'ble'
+TRANSPORT_SERIAL = 'serial'
+TRANSPORT_TCP = 'tcp'
+DEFAULT_BAUDRATE = 9600
+DEFAULT_TCP_PORT = 502
+RESPONSE_TIMEOUT = 2 # (seconds)
+WIRED_MTU = 256 # a whole RTU frame always arrives in one piece
+
+# Try to import pyserial-asyncio only when a serial transport is configured
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+async def read_rtu_frame(reader):
+    """Read one Modbus RTU response frame and verify its CRC."""
+    head = await reader.readexactly(2)
+    function = head[1]
+    if function & 0x80: # exception response: code + crc
+        rest = await reader.readexactly(3)
+    elif function in (3, 4): # read: byte count + data + crc
+        count = await reader.readexactly(1)
+        rest = count + await reader.readexactly(count[0] + 2)
+    elif function in (6, 16): # write echo: register + value + crc
+        rest = await reader.readexactly(6)
+    else:
+        raise ValueError(f"Unsupported Modbus function {function}")
+    frame = head + rest
+    if crc16_modbus(frame[:-2]) != frame[-2:]:
+        raise ValueError(f"CRC mismatch: {frame.hex()}")
+    return frame
+
+class ModbusLink:
+    """One physical connection (serial port or gateway socket) shared by every device behind it."""
+
+    def __init__(self, key, opener):
+        self.key = key
+        self.opener = opener
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock() # Modbus is half duplex: one request in flight per link
+        self.users = 0
+
+    async def open(self):
+        if self.writer is None or self.writer.is_closing():
+            self.reader, self.writer = await self.opener()
+            _LOGGER.info(f"Opened Modbus link {self.key}")
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            _LOGGER.info(f"Closed Modbus link {self.key}")
+        self.reader = self.writer = None
+
+    async def transact(self, request):
+        async with self.lock:
+            await self.open()
+            self.writer.write(bytes(request))
+            await self.writer.drain()
+            try:
+                return await asyncio.wait_for(read_rtu_frame(self.reader), RESPONSE_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                # Drop the link so a half-read frame can't desync the next transaction
+                self.close()
+                raise
+
+_LINKS = {}
+
+def _acquire_link(key, opener):
+    link = _LINKS.get(key)
+    if link is None:
+        link = _LINKS[key] = ModbusLink(key, opener)
+    link.users += 1
+    return link
+
+def _release_link(link):
+    link.users -= 1
+    if link.users <= 0:
+        link.close()
+        _LINKS.pop(link.key, None)
+
+class StreamTransport:
+    """Request/response transport over a pooled Modbus RTU link."""
+
+    def __init__(self, key, opener, on_resolved, on_data, on_connect_fail):
+        self.key = key
+        self.opener = opener
+        self.on_resolved = on_resolved
+        self.on_data = on_data
+        self.on_connect_fail = on_connect_fail
+        self.link = None
+        self.mtu_size = WIRED_MTU
+
+    @property
+    def is_connected(self):
+        return self.link is not None and self.link.writer is not None
+
+    async def connect(self, report_failure=True):
+        try:
+            if self.link is None:
+                self.link = _acquire_link(self.key, self.opener)
+            await self.link.open()
+            self.on_resolved()
+            return True
+        except Exception as e:
+            _LOGGER.error(f"Connection to {self.key} failed: {e}")
+            if report_failure:
+                self.on_connect_fail(e)
+            return False
+
+    async def disconnect(self):
+        if self.link is not None:
+            _release_link(self.link)
+            self.link = None
+
+    async def characteristic_write_value(self, value):
+        if self.link is None:
+            _LOGGER.warning(f"Write to {self.key} while disconnected")
+            return
+        try:
+            frame = await self.link.transact(value)
+        except Exception as e:
+            _LOGGER.error(f"Modbus request via {self.key} failed: {e}")
+            return
+        # Delivered as its own task like BLE.Device does: a failing handler can't tear down the
+        # pooled link, and a handler that chains the next request doesn't nest inside this one
+        result = self.on_data(bytearray(frame))
+        if asyncio.iscoroutine(result):
+            asyncio.ensure_future(result)
+
+    def connection_info(self):
+        return {}
+
+def create_transport(dev, on_resolved, on_data, on_connect_fail, notify_uuid, write_uuid, **ble_kwargs):
+    """Build the transport selected by the device config's `transport` key (default: ble)."""
+    kind = dev.get('transport', TRANSPORT_BLE)
+    if kind == TRANSPORT_BLE:
+        from .BLE import Device
+        return Device(
+            mac_address=dev.get('mac_addr', dev.get('mac')),
+            on_resolved=on_resolved,
+            on_data=on_data,
+            on_connect_fail=on_connect_fail,
+            notify_uuid=notify_uuid,
+            write_uuid=write_uuid,
+            **ble_kwargs
+        )
+    if kind == TRANSPORT_SERIAL:
+        if serial_asyncio is None:
+            raise ValueError("Serial transport requires the pyserial-asyncio package")
+        port = dev['serial_port']
+        baudrate = int(dev.get('baudrate', DEFAULT_BAUDRATE))
+        opener = lambda: serial_asyncio.open_serial_connection(url=port, baudrate=baudrate)
+        return StreamTransport(f"serial:{port}", opener, on_resolved, on_data, on_connect_fail)
+    if kind == TRANSPORT_TCP:
+        host = dev['host']
+        port = int(dev.get('port', DEFAULT_TCP_PORT))
+        opener = lambda: asyncio.open_connection(host, port)
+        return StreamTransport(f"tcp:{host}:{port}", opener, on_resolved, on_data, on_connect_fail)
+    raise ValueError(f"Unknown transport: {kind}")
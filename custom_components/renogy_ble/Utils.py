@@ -47,9 +47,23 @@ def parse_temperature(raw_value, unit):
 def format_temperature(celcius, unit = 'F'):
     return (celcius * 9/5) + 32 if unit.strip() == 'F' else celcius
 
-def filter_fields(data, fields_str):
-    fields = [x.strip() for x in fields_str.split(',')] if len(fields_str) > 0 else [] # trim spaces
-    if len(fields) > 0 and set(fields).issubset(data):
+# Parses a comma separated string (or any iterable) into a frozenset of trimmed field names
+# None (or an empty string from YAML) means "not configured": every field is kept.
+# An explicit empty list is an empty frozenset: no field is kept.
+def parse_fields(fields):
+    if fields is None or fields == '':
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return frozenset(x.strip() for x in fields if x and x.strip())
+
+# Accepts a pre-parsed frozenset; strings are still parsed for backwards compatibility
+def filter_fields(data, fields):
+    if not isinstance(fields, frozenset):
+        fields = parse_fields(fields)
+    if fields is None:
+        return data
+    if not fields or fields.issubset(data):
         return {key: data[key] for key in fields}
     return data
 
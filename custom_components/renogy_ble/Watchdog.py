@@ -0,0 +1,76 @@
+import logging
+import time
+_LOGGER = logging.getLogger(__name__)
+# Detects a notification stream that went quiet while the link still looks connected.
+# The normal notification interval is learned (EWMA); a stall is declared once nothing arrived
+# for `multiple` times that interval. Checks run on the shared scheduler, feeding is just a timestamp.
+
+DEFAULT_STALL_MULTIPLE = 5
+MIN_STALL_TIMEOUT = 3 # (seconds)
+MAX_STALL_TIMEOUT = 120 # (seconds)
+INITIAL_STALL_TIMEOUT = 30 # (seconds) used until enough intervals were seen
+MIN_SAMPLES = 5
+EWMA_ALPHA = 0.2
+CHECK_INTERVAL = 1 # (seconds)
+
+class StallWatchdog:
+    def __init__(self, scheduler, name, on_stall, multiple=DEFAULT_STALL_MULTIPLE):
+        self.scheduler = scheduler
+        self.name = name
+        self.on_stall = on_stall
+        self.multiple = multiple
+        self.interval = None
+        self.samples = 0
+        self.last_seen = None
+        self.stalls = 0
+        self.consecutive_stalls = 0
+        self._check = None
+
+    @property
+    def timeout(self):
+        if self.samples < MIN_SAMPLES:
+            base = INITIAL_STALL_TIMEOUT
+        else:
+            base = min(max(self.multiple * self.interval, MIN_STALL_TIMEOUT), MAX_STALL_TIMEOUT)
+        # Back off while the device stays silent so recovery attempts don't hammer the adapter
+        return min(base * (2 ** self.consecutive_stalls), MAX_STALL_TIMEOUT)
+
+    def start(self):
+        self.last_seen = time.monotonic()
+        if self._check is None:
+            self._check = self.scheduler.call_every(CHECK_INTERVAL, self._on_check, name=f"watchdog:{self.name}")
+
+    def stop(self):
+        if self._check is not None:
+            self._check.cancel()
+            self._check = None
+
+    def feed(self):
+        now = time.monotonic()
+        if self.last_seen is not None and self.consecutive_stalls == 0:
+            gap = now - self.last_seen
+            self.interval = gap if self.interval is None else self.interval + EWMA_ALPHA * (gap - self.interval)
+            self.samples += 1
+        self.consecutive_stalls = 0
+        self.last_seen = now
+
+    def stats(self):
+        return {
+            'interval': round(self.interval, 3) if self.interval is not None else None,
+            'timeout': round(self.timeout, 3),
+            'silent_for': round(time.monotonic() - self.last_seen, 3) if self.last_seen is not None else None,
+            'stalls': self.stalls,
+        }
+
+    def _on_check(self):
+        if self.last_seen is None:
+            return
+        silent = time.monotonic() - self.last_seen
+        timeout = self.timeout
+        if silent < timeout:
+            return
+        self.stalls += 1
+        self.consecutive_stalls += 1
+        self.last_seen = time.monotonic()
+        _LOGGER.warning(f"[{self.name}] No notifications for {silent:.1f}s (limit {timeout:.1f}s), stream stalled")
+        self.on_stall()
@@ -0,0 +1,276 @@
+"""
+This file is part of renogy_ble.
+
+renogy_ble is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+renogy_ble is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with renogy_ble. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import asyncio
+import configparser
+import logging
+import os
+import time
+from .ConnectionCache import FileConnectionCache, default_cache_path
+from .IngestQueue import IngestQueue, POLICY_DROP_OLDEST
+from .Settings import ClientSettings
+from .WorkerProtocol import MSG_SAMPLE, MSG_ERROR, encode_sample, encode_error, decode_sample, decode_error, read_message
+_LOGGER = logging.getLogger(__name__)
+# Out-of-process BLE worker. The worker owns the BLE clients, decodes every frame and streams compact
+# binary samples over a Unix socket; Home Assistant only consumes them through RemoteShuntClient.
+#
+# Run with: python -m custom_components.renogy_ble.Worker --config shunts.ini|yaml --socket /run/renogy_ble.sock
+
+CONSUMER_QUEUE_SIZE = 256
+RECONNECT_DELAY = 5 # (seconds)
+
+# Try to import PyYAML only when reading YAML device files
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+def load_device_configs(path):
+    """Read device configs from an INI file (one section per device) or a YAML file."""
+    if path.endswith(('.yaml', '.yml')):
+        return _load_yaml_device_configs(path)
+    parser = configparser.ConfigParser()
+    if not parser.read(path):
+        raise FileNotFoundError(path)
+    devices = []
+    for name in parser.sections():
+        section = parser[name]
+        if 'mac_addr' not in section:
+            continue
+        cfg = dict(section)
+        cfg.setdefault('alias', name)
+        cfg.setdefault('device_id', '255')
+        devices.append(cfg)
+    return devices
+
+def _load_yaml_device_configs(path):
+    # Accepts either the HA layout (renogy_ble: devices: [...]) or a bare devices: [...] list
+    if yaml is None:
+        raise ValueError("Reading YAML device files requires the PyYAML package")
+    with open(path) as f:
+        doc = yaml.safe_load(f) or {}
+    devices = doc.get('renogy_ble', doc).get('devices', [])
+    configs = []
+    for device in devices:
+        cfg = {k: str(v) for k, v in device.items()}
+        cfg.setdefault('alias', cfg.get('mac_addr'))
+        cfg.setdefault('device_id', '255')
+        configs.append(cfg)
+    return configs
+
+class WorkerServer:
+    def __init__(self, socket_path, devices, queue_size=CONSUMER_QUEUE_SIZE, cache_path=None):
+        self.socket_path = socket_path
+        self.devices = devices
+        self.queue_size = queue_size
+        self.connection_cache = FileConnectionCache(cache_path) if cache_path else None
+        self.clients = []
+        self.consumers = set()
+
+    async def run(self):
+        from .ShuntClient import ShuntClient
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_consumer, path=self.socket_path)
+        _LOGGER.info(f"Worker listening on {self.socket_path}")
+
+        for cfg in self.devices:
+            client = ShuntClient(cfg, on_error_callback=self._on_error)
+            client.on_sample_callback = self._on_sample
+            if self.connection_cache is not None:
+                self.connection_cache.attach(client)
+            client.start()
+            self.clients.append(client)
+
+        async with server:
+            await server.serve_forever()
+
+    def _broadcast(self, message):
+        for queue in self.consumers:
+            queue.put_nowait(message)
+
+    def _on_sample(self, client, data):
+        if self.consumers:
+            self._broadcast(encode_sample(client.mac, client.alias, time.time(), data))
+
+    def _on_error(self, client, error):
+        self._broadcast(encode_error(client.mac, error))
+
+    async def _handle_consumer(self, reader, writer):
+        # Each consumer gets its own bounded queue; a slow consumer only loses its own oldest samples
+        queue = IngestQueue(maxsize=self.queue_size, policy=POLICY_DROP_OLDEST, name='consumer')
+        self.consumers.add(queue)
+        _LOGGER.info("Consumer connected")
+        try:
+            while True:
+                message = await queue.get()
+                writer.write(message)
+                await writer.drain()
+                queue.task_done()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.consumers.discard(queue)
+            writer.close()
+            _LOGGER.info(f"Consumer disconnected: {queue.stats()}")
+
+class WorkerConnection:
+    """Integration side of the worker socket, shared by every RemoteShuntClient using it."""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.clients = {}
+        self.task = None
+        self.connected = False
+
+    def register(self, client):
+        self.clients[client.mac.upper()] = client
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._run())
+
+    def unregister(self, client):
+        self.clients.pop(client.mac.upper(), None)
+        if not self.clients and self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+                self.connected = True
+                _LOGGER.info(f"Connected to BLE worker at {self.socket_path}")
+                try:
+                    while True:
+                        msg_type, payload = await read_message(reader)
+                        self._dispatch(msg_type, payload)
+                finally:
+                    self.connected = False
+                    writer.close()
+            except (OSError, asyncio.IncompleteReadError) as e:
+                _LOGGER.warning(f"BLE worker connection lost: {e}. Retrying in {RECONNECT_DELAY} seconds...")
+                for client in list(self.clients.values()):
+                    client.handle_error(e)
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    def _dispatch(self, msg_type, payload):
+        if msg_type == MSG_SAMPLE:
+            mac, alias, timestamp, data = decode_sample(payload)
+            client = self.clients.get(mac)
+            if client is not None:
+                client.handle_sample(timestamp, data)
+        elif msg_type == MSG_ERROR:
+            mac, message = decode_error(payload)
+            client = self.clients.get(mac)
+            if client is not None:
+                client.handle_error(message)
+        else:
+            _LOGGER.warning(f"Unknown worker message type={msg_type}")
+
+class RemoteShuntClient:
+    """Stand-in for ShuntClient whose frames are decoded by the worker process."""
+
+    def __init__(self, config, connection, on_data_callback=None, on_error_callback=None):
+        dev = config.get('device', config)
+        self.alias = dev['alias']
+        self.mac = dev.get('mac_addr', dev.get('mac'))
+        self.connection = connection
+        self.on_data_callback = on_data_callback
+        self.on_error_callback = on_error_callback
+        self.on_sample_callback = None
+        self.settings = ClientSettings.from_config(dev)
+        self.data = {}
+        self._last_log_time = 0
+        self._published = {}
+        self.last_frame_time = None
+
+    def start(self):
+        self.connection.register(self)
+
+    def stop(self):
+        self.connection.unregister(self)
+
+    def apply_settings(self, settings):
+        self.settings = settings
+        self._published = {}
+
+    # The worker always decodes the full field map
+    def set_field_demand(self, consumer, fields):
+        pass
+
+    def release_field_demand(self, consumer):
+        pass
+
+    def snapshot(self):
+        return {
+            'alias': self.alias,
+            'mac': self.mac,
+            'timestamp': self.last_frame_time,
+            'data': dict(self.data),
+            'health': {
+                'connected': self.connection.connected,
+                'worker': self.connection.socket_path,
+            },
+        }
+
+    def handle_sample(self, timestamp, data):
+        self.last_frame_time = timestamp
+        self.data.update(data)
+        self.__safe_callback(self.on_sample_callback, self.data)
+        if timestamp - self._last_log_time >= self.settings.aggregation_window:
+            self._last_log_time = timestamp
+            publish = self.settings.select(self.data, self._published)
+            if publish:
+                self.__safe_callback(self.on_data_callback, publish)
+
+    def handle_error(self, error):
+        self.__safe_callback(self.on_error_callback, error)
+        self._reset_publish_state()
+
+    def _reset_publish_state(self):
+        # Same as BaseShuntClient: the entities just went unavailable, so the next sample is published
+        # in full even if no reading moved past its deadband
+        self._published = {}
+        self._last_log_time = 0
+
+    def __safe_callback(self, callback, param):
+        if callback:
+            try:
+                callback(self, param)
+            except Exception as e:
+                _LOGGER.error(f"Exception in callback: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Renogy BLE worker: streams decoded samples over a Unix socket")
+    parser.add_argument('--config', required=True, help="INI or YAML file listing the devices")
+    parser.add_argument('--socket', default='/run/renogy_ble.sock', help="Unix socket path to listen on")
+    parser.add_argument('--queue-size', type=int, default=CONSUMER_QUEUE_SIZE, help="Per-consumer sample queue size")
+    parser.add_argument('--cache', help="Connection cache file for fast restarts (default: <config>.cache.json, '' to disable)")
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    cache_path = default_cache_path(args.config) if args.cache is None else args.cache
+    server = WorkerServer(args.socket, load_device_configs(args.config), queue_size=args.queue_size, cache_path=cache_path)
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import struct
+from .ShuntClient import ALL_SHUNT_FIELDS
+# Compact binary framing for samples streamed from the BLE worker process to Home Assistant.
+#
+# message := header payload
+# header  := length:uint32 type:uint8            (length counts the payload only)
+# SAMPLE  := timestamp:float64 mac:6s alias_len:uint8 alias:utf8 count:uint8 (field_id:uint8 value:float64)*
+#
+# Field ids are positions in SAMPLE_FIELDS; only append to it so old consumers keep working.
+# It must list every field of ShuntClient.ALL_SHUNT_FIELDS, which is checked at import time.
+
+MSG_SAMPLE = 1
+MSG_ERROR = 2
+
+HEADER = struct.Struct('!IB')
+SAMPLE_HEAD = struct.Struct('!d6sB')
+FIELD = struct.Struct('!Bd')
+
+SAMPLE_FIELDS = (
+    'charge_battery_voltage',
+    'starter_battery_voltage',
+    'discharge_amps',
+    'discharge_watts',
+    'state_of_charge',
+    'temperature_sensor_1',
+    'temperature_sensor_2',
+)
+FIELD_IDS = {name: i for i, name in enumerate(SAMPLE_FIELDS)}
+
+if frozenset(SAMPLE_FIELDS) != ALL_SHUNT_FIELDS:
+    raise RuntimeError(
+        f"WorkerProtocol.SAMPLE_FIELDS is out of sync with the shunt field map: "
+        f"missing {sorted(ALL_SHUNT_FIELDS - frozenset(SAMPLE_FIELDS))}, "
+        f"unknown {sorted(frozenset(SAMPLE_FIELDS) - ALL_SHUNT_FIELDS)}"
+    )
+
+def mac_to_bytes(mac):
+    return bytes.fromhex(mac.replace(':', ''))
+
+def bytes_to_mac(bs):
+    return ':'.join(f"{b:02X}" for b in bs)
+
+def encode_sample(mac, alias, timestamp, data):
+    alias_bytes = (alias or '').encode()[:255]
+    fields = [
+        FIELD.pack(FIELD_IDS[k], float(v))
+        for k, v in data.items()
+        if k in FIELD_IDS and isinstance(v, (int, float))
+    ]
+    payload = b''.join((
+        SAMPLE_HEAD.pack(timestamp, mac_to_bytes(mac), len(alias_bytes)),
+        alias_bytes,
+        bytes((len(fields),)),
+        *fields
+    ))
+    return HEADER.pack(len(payload), MSG_SAMPLE) + payload
+
+def decode_sample(payload):
+    timestamp, mac, alias_len = SAMPLE_HEAD.unpack_from(payload, 0)
+    offset = SAMPLE_HEAD.size
+    alias = payload[offset:offset + alias_len].decode(errors='replace')
+    offset += alias_len
+    count = payload[offset]
+    offset += 1
+    data = {}
+    for _ in range(count):
+        field_id, value = FIELD.unpack_from(payload, offset)
+        offset += FIELD.size
+        if field_id < len(SAMPLE_FIELDS):
+            data[SAMPLE_FIELDS[field_id]] = value
+    return bytes_to_mac(mac), alias, timestamp, data
+
+def encode_error(mac, message):
+    payload = mac_to_bytes(mac) + str(message).encode()[:1024]
+    return HEADER.pack(len(payload), MSG_ERROR) + payload
+
+def decode_error(payload):
+    return bytes_to_mac(payload[:6]), payload[6:].decode(errors='replace')
+
+async def read_message(reader):
+    """Read one framed message from an asyncio StreamReader; returns (type, payload)."""
+    header = await reader.readexactly(HEADER.size)
+    length, msg_type = HEADER.unpack(header)
+    return msg_type, await reader.readexactly(length)
@@ -1,12 +1,21 @@
 # pylint: disable=missing-function-docstring, missing-class-docstring, missing-module-docstring
 import logging
 import asyncio
-from homeassistant.core import HomeAssistant
-from homeassistant.config_entries import ConfigEntry
-from .sensor import RenogyBLESensor, update_sensors
-from .ShuntClient import ShuntClient
-from .Utils import filter_fields
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from .ShuntClient import ShuntClient, ALL_SHUNT_FIELDS
+from .Utils import filter_fields, parse_fields
+from .Settings import ClientSettings
+from .ExportSink import LineProtocolExporter
+from .Worker import RemoteShuntClient, WorkerConnection
+# Home Assistant is optional so the clients can be used headless (python -m custom_components.renogy_ble)
+try:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP, STATE_UNAVAILABLE
+    from .sensor import RenogyBLESensor, update_sensors, set_available
+    from .device_cache import async_get_device_cache
+    from .api import async_register_api
+except ImportError:
+    HomeAssistant = ConfigEntry = None
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "renogy_ble"
@@ -39,25 +48,86 @@ SENSOR_TYPES = {
     'state_of_charge': ['State of Charge', '%'],
 }
 
+def _setup_exporter(hass: HomeAssistant, export_conf: dict):
+    """Create the shared time-series exporter from the `export` YAML section."""
+    try:
+        exporter = LineProtocolExporter(
+            export_conf['target'],
+            measurement=export_conf.get('measurement', 'renogy'),
+            batch_size=export_conf.get('batch_size', 500),
+            flush_interval=export_conf.get('flush_interval', 10),
+            spool_path=export_conf.get('spool_path'),
+            spool_max_bytes=export_conf.get('spool_max_bytes', 5 * 1024 * 1024),
+        )
+    except (KeyError, ValueError) as e:
+        _LOGGER.error(f"Invalid renogy_ble export config: {e}")
+        return None
+    exporter.start(hass.loop)
+
+    async def stop_exporter(event):
+        await exporter.stop()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_exporter)
+    return exporter
+
+def _attach_exporter(hass: HomeAssistant, client):
+    client.on_sample_callback = lambda c, data: _export_sample(hass, c, data)
+    if hass.data.get(DOMAIN, {}).get('exporter') is not None:
+        # The exporter forwards every field, so it demands the full frame
+        client.set_field_demand('exporter', ALL_SHUNT_FIELDS)
+
+def _ha_ble_device(hass: HomeAssistant, mac, adapter):
+    """BLEDevice from HA's bluetooth integration, preferring the configured adapter when it sees the device."""
+    from homeassistant.components import bluetooth
+    devices_by_address = getattr(bluetooth, 'async_scanner_devices_by_address', None)
+    if devices_by_address is not None:
+        for scanner_device in devices_by_address(hass, mac, connectable=True):
+            if getattr(scanner_device.scanner, 'adapter', None) == adapter:
+                return scanner_device.ble_device
+    return bluetooth.async_ble_device_from_address(hass, mac, connectable=True)
+
+def _create_client(hass: HomeAssistant, cfg, on_data_received, on_error, device_cache):
+    """In-process BLE client, or a consumer of the out-of-process worker when worker_socket is set."""
+    socket_path = cfg.get('worker_socket')
+    if not socket_path:
+        client = ShuntClient(cfg, on_data_received, on_error)
+        client.connection_cache = device_cache.get(client.mac)
+        client.on_connection_cached = lambda c, info: device_cache.update(c.mac, info)
+        client.ble_device_resolver = lambda mac, adapter: _ha_ble_device(hass, mac, adapter)
+        return client
+    workers = hass.data[DOMAIN].setdefault('workers', {})
+    if socket_path not in workers:
+        workers[socket_path] = WorkerConnection(socket_path)
+    return RemoteShuntClient(cfg, workers[socket_path], on_data_received, on_error)
+
+def _export_sample(hass: HomeAssistant, client, data):
+    exporter = hass.data.get(DOMAIN, {}).get('exporter')
+    if exporter is not None:
+        exporter.add({'device': client.alias, 'mac': client.mac}, data)
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Renogy BLE from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
 
-    conf = entry.data
+    # Options override the values captured by the config flow
+    conf = {**entry.data, **entry.options}
 
     # Callbacks for BLE client
     def on_data_received(client, data):
         from .sensor import update_sensors
-        update_sensors(data)
+        update_sensors(data, client.mac)
 
     def on_error(client, error):
         _LOGGER.error(f"BLE client error: {error}")
-        from .sensor import update_sensors
-        update_sensors({})
+        from .sensor import set_available
+        set_available(client.mac, False)
 
-    async def connect_client(cfg):
-        client = ShuntClient(cfg, on_data_received, on_error)
+    device_cache = await async_get_device_cache(hass)
+    client = _create_client(hass, conf, on_data_received, on_error, device_cache)
+    _attach_exporter(hass, client)
+    hass.data[DOMAIN][entry.entry_id] = {"config": entry.data, "client": client}
+
+    async def connect_client():
         while True:
             try:
                 client.start()
@@ -66,18 +136,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 _LOGGER.error(f"Client connection failed: {e}. Retrying in 5 seconds...")
                 await asyncio.sleep(5)
 
-    # Schedule connection after Home Assistant startup
+    # Schedule connection after Home Assistant startup (or now, for entries added/reloaded at runtime)
     def schedule_connect(event):
-        hass.loop.create_task(connect_client(conf))
+        hass.loop.create_task(connect_client())
 
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, schedule_connect)
+    if hass.is_running:
+        schedule_connect(None)
+    else:
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, schedule_connect)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
 
     # Forward the config entry to the sensor platform
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
     return True
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running client without reconnecting."""
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    worker_socket = {**entry.data, **entry.options}.get('worker_socket') or None
+    current_socket = client.connection.socket_path if isinstance(client, RemoteShuntClient) else None
+    if worker_socket != current_socket:
+        # Moving between in-process and worker mode needs a new client
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+    client.apply_settings(ClientSettings.from_config(entry.data, entry.options))
+    _LOGGER.info(f"Applied new options to {client.alias}")
+
 async def async_setup(hass: HomeAssistant, haconfig: dict):
     """Set up Renogy BLE from YAML config (optional)."""
+    # The snapshot API covers config entries too, so it is registered even without YAML
+    async_register_api(hass)
+
     # Skip YAML setup when no YAML config is present
     conf = haconfig.get(DOMAIN)
     if not conf:
@@ -87,6 +176,9 @@ async def async_setup(hass: HomeAssistant, haconfig: dict):
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN]['entities'] = []
 
+    if conf.get('export'):
+        hass.data[DOMAIN]['exporter'] = _setup_exporter(hass, conf['export'])
+
     devices = conf.get('devices', [])
     if not devices:
         _LOGGER.warning("No devices configured under renogy_ble.devices, skipping YAML setup")
@@ -100,26 +192,31 @@ async def async_setup(hass: HomeAssistant, haconfig: dict):
         for sensor_type in SENSOR_TYPES:
             sensor = RenogyBLESensor(sensor_type, alias, mac)
             sensors.append(sensor)
-            hass.states.async_set(sensor.entity_id, sensor.state, sensor.attributes)
+            hass.states.async_set(sensor.entity_id, STATE_UNAVAILABLE, sensor.extra_state_attributes)
     hass.data[DOMAIN]['entities'] = sensors
     _LOGGER.info("Renogy BLE sensors set up successfully.")
 
     # Define callbacks
+    fields = parse_fields(conf.get('fields'))
+
     def on_data_received(client, data):
-        filtered = filter_fields(data, conf.get('fields', []))
+        filtered = filter_fields(data, fields)
         _LOGGER.debug(f"{client.alias or client.mac} => {filtered}")
         if not conf.get('enable_polling', True):
             client.disconnect()
-        update_sensors(filtered)
+        update_sensors(filtered, client.mac)
 
     def on_error(client, error):
         _LOGGER.error(f"BLE client error: {error}")
-        update_sensors({})
+        set_available(client.mac, False)
+
+    device_cache = await async_get_device_cache(hass)
 
     # Connection coroutine
     async def connect_client(cfg):
-        client_cls = ShuntClient
-        client = client_cls(cfg, on_data_received, on_error)
+        client = _create_client(hass, cfg, on_data_received, on_error, device_cache)
+        _attach_exporter(hass, client)
+        hass.data[DOMAIN].setdefault('yaml_clients', []).append(client)
         while True:
             try:
                 client.start()
@@ -145,6 +242,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Tell HA to unload the sensor platform
     await hass.config_entries.async_forward_entry_unload(entry, "sensor")
 
+    entry_data = hass.data[DOMAIN].pop(entry.entry_id, None)
+    if entry_data:
+        entry_data["client"].stop()
+
     # Then remove your entities from hass.data and HA states as before
     alias = entry.data.get("alias")
     to_remove = [
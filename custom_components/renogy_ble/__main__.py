@@ -0,0 +1,126 @@
+"""
+This file is part of renogy_ble.
+
+renogy_ble is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+renogy_ble is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with renogy_ble. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import asyncio
+import csv
+import logging
+import sys
+import time
+from .ConnectionCache import FileConnectionCache, default_cache_path
+from .ShuntClient import ShuntClient
+from .Worker import load_device_configs
+from .WorkerProtocol import SAMPLE_FIELDS, encode_sample
+_LOGGER = logging.getLogger(__name__)
+# Headless logger: runs shunt clients without Home Assistant and records every decoded frame
+# at full notification rate (no aggregation window, no deadbands).
+#
+# Run with: python -m custom_components.renogy_ble --config shunts.ini --output capture.csv
+
+STATS_INTERVAL = 5 # (seconds)
+
+class FrameLogger:
+    def __init__(self, output, fmt='csv'):
+        self.fmt = fmt
+        self.frames = {}
+        self.last_frames = {}
+        if fmt == 'csv':
+            self.file = open(output, 'w', newline='') if output != '-' else sys.stdout
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(('timestamp', 'device', 'mac') + SAMPLE_FIELDS)
+        else:
+            # Same framing the worker streams, so captures can be replayed into a consumer
+            self.file = open(output, 'ab')
+            self.writer = None
+
+    def on_sample(self, client, data):
+        timestamp = time.time()
+        self.frames[client.alias] = self.frames.get(client.alias, 0) + 1
+        if self.writer is not None:
+            self.writer.writerow([f"{timestamp:.3f}", client.alias, client.mac] + [data.get(k, '') for k in SAMPLE_FIELDS])
+        else:
+            self.file.write(encode_sample(client.mac, client.alias, timestamp, data))
+
+    def on_error(self, client, error):
+        _LOGGER.error(f"[{client.alias}] {error}")
+
+    def print_stats(self, clients, elapsed):
+        for client in clients:
+            total = self.frames.get(client.alias, 0)
+            rate = (total - self.last_frames.get(client.alias, 0)) / elapsed
+            self.last_frames[client.alias] = total
+            queue = client.ingest_queue.stats()
+            rx = client.receive_stats()
+            print(f"{client.alias}: {rate:.1f} frames/s, {total} total, "
+                  f"queue depth {queue['depth']}/{queue['maxsize']}, dropped {queue['dropped'] + queue['coalesced']}, "
+                  f"duplicates {rx['duplicates']}, rejected {rx['rejected']}, MTU {rx['mtu']} ({rx['mode']}), "
+                  f"{rx['frames_per_notification']} frames/notification",
+                  file=sys.stderr)
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+async def run(args):
+    frame_logger = FrameLogger(args.output, args.format)
+    clients = []
+    cache_path = default_cache_path(args.config) if args.cache is None else args.cache
+    connection_cache = FileConnectionCache(cache_path) if cache_path else None
+    for cfg in load_device_configs(args.config):
+        client = ShuntClient(cfg, on_error_callback=frame_logger.on_error)
+        client.on_sample_callback = frame_logger.on_sample
+        client.suppress_duplicates = not args.keep_duplicates
+        if connection_cache is not None:
+            connection_cache.attach(client)
+        client.start()
+        clients.append(client)
+    if not clients:
+        _LOGGER.error(f"No devices found in {args.config}")
+        return
+
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            frame_logger.print_stats(clients, args.stats_interval)
+    finally:
+        for client in clients:
+            client.stop()
+        frame_logger.close()
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m custom_components.renogy_ble',
+                                     description="Log every decoded Renogy shunt frame without Home Assistant")
+    parser.add_argument('--config', required=True, help="INI or YAML file listing the devices")
+    parser.add_argument('--output', default='-', help="Output file ('-' for stdout, csv only)")
+    parser.add_argument('--format', choices=('csv', 'binary'), default='csv')
+    parser.add_argument('--stats-interval', type=float, default=STATS_INTERVAL, help="Seconds between throughput reports")
+    parser.add_argument('--keep-duplicates', action='store_true', help="Decode frames identical to the previous one again instead of reusing its values")
+    parser.add_argument('--cache', help="Connection cache file for fast restarts (default: <config>.cache.json, '' to disable)")
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+    if args.format == 'binary' and args.output == '-':
+        parser.error("--format binary needs an --output file")
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# pylint: disable=missing-function-docstring, missing-module-docstring
+import logging
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from .Scheduler import get_scheduler
+from .const import DOMAIN
+try:
+    from homeassistant.core import SupportsResponse
+except ImportError:
+    SupportsResponse = None # Home Assistant < 2023.7 has no service responses
+_LOGGER = logging.getLogger(__name__)
+# Bulk read access to every configured device in one call, served from the snapshots the clients
+# keep up to date themselves (never from hass.states):
+#   service   renogy_ble.get_snapshot          -> {"devices": [...]}
+#   websocket renogy_ble/snapshot              -> {"devices": [...], "scheduler": {...}}
+#   websocket renogy_ble/subscribe_snapshot    -> full snapshot, then per-device deltas at most every min_interval
+
+SERVICE_GET_SNAPSHOT = 'get_snapshot'
+DEFAULT_MIN_INTERVAL = 1.0 # (seconds)
+MIN_INTERVAL = 0.2 # (seconds) floor so a subscriber can't turn this into a busy loop
+
+def _clients(hass: HomeAssistant):
+    domain_data = hass.data.get(DOMAIN, {})
+    clients = list(domain_data.get('yaml_clients', []))
+    for value in domain_data.values():
+        if isinstance(value, dict) and value.get('client') is not None:
+            clients.append(value['client'])
+    return clients
+
+def collect_snapshot(hass: HomeAssistant):
+    return [client.snapshot() for client in _clients(hass)]
+
+def _diff(previous, current):
+    """Keys of a device snapshot section whose value changed since the last push."""
+    return {k: v for k, v in current.items() if previous.get(k) != v}
+
+def _delta(previous, snapshot):
+    if previous is None:
+        return snapshot
+    delta = {}
+    for section in ('data', 'health'):
+        changed = _diff(previous[section], snapshot[section])
+        if changed:
+            delta[section] = changed
+    if not delta:
+        return None
+    delta['mac'] = snapshot['mac']
+    delta['alias'] = snapshot['alias']
+    delta['timestamp'] = snapshot['timestamp']
+    return delta
+
+@websocket_api.websocket_command({vol.Required('type'): 'renogy_ble/snapshot'})
+@callback
+def ws_snapshot(hass: HomeAssistant, connection, msg):
+    connection.send_result(msg['id'], {
+        'devices': collect_snapshot(hass),
+        'scheduler': get_scheduler(hass.loop).stats(),
+    })
+
+@websocket_api.websocket_command({
+    vol.Required('type'): 'renogy_ble/subscribe_snapshot',
+    vol.Optional('min_interval', default=DEFAULT_MIN_INTERVAL): vol.All(vol.Coerce(float), vol.Range(min=MIN_INTERVAL)),
+})
+@callback
+def ws_subscribe_snapshot(hass: HomeAssistant, connection, msg):
+    last = {}
+
+    def push():
+        deltas = []
+        for snapshot in collect_snapshot(hass):
+            delta = _delta(last.get(snapshot['mac']), snapshot)
+            last[snapshot['mac']] = snapshot
+            if delta is not None:
+                deltas.append(delta)
+        if deltas:
+            connection.send_message(websocket_api.event_message(msg['id'], {'devices': deltas}))
+
+    # Pushes ride the shared scheduler, so the rate is capped no matter how fast frames arrive
+    timer = get_scheduler(hass.loop).call_every(msg['min_interval'], push, name='snapshot_subscription')
+    connection.subscriptions[msg['id']] = timer.cancel
+    connection.send_result(msg['id'])
+    push()
+
+@callback
+def async_register_api(hass: HomeAssistant):
+    if hass.services.has_service(DOMAIN, SERVICE_GET_SNAPSHOT):
+        return
+    websocket_api.async_register_command(hass, ws_snapshot)
+    websocket_api.async_register_command(hass, ws_subscribe_snapshot)
+
+    if SupportsResponse is None:
+        _LOGGER.warning(f"{DOMAIN}.{SERVICE_GET_SNAPSHOT} needs a newer Home Assistant, only the websocket API is available")
+        return
+
+    @callback
+    def get_snapshot(call: ServiceCall):
+        return {'devices': collect_snapshot(hass)}
+
+    hass.services.async_register(DOMAIN, SERVICE_GET_SNAPSHOT, get_snapshot, supports_response=SupportsResponse.ONLY)
@@ -1,29 +1,56 @@
 from homeassistant import config_entries
+from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 import asyncio
 import logging
 import os
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_POLL_INTERVAL,
+    CONF_AGGREGATION_WINDOW,
+    CONF_DEADBANDS,
+    CONF_FIELDS,
+    CONF_ADAPTER,
+    CONF_STALL_MULTIPLE,
+    CONF_WORKER_SOCKET,
+)
+from .sensor import SENSOR_TYPES
+from .Settings import DEFAULT_POLL_INTERVAL, DEFAULT_AGGREGATION_WINDOW, DEFAULT_STALL_MULTIPLE, parse_deadbands
 
 _LOGGER = logging.getLogger(__name__)
 
 # Try to import bleak only when scanning
 try:
     from bleak import BleakScanner
+    from .BaseClient import ALIAS_PREFIXES
+    from .BaseShuntClient import ALIAS_PREFIX, ALIAS_PREFIX_PRO
+    RENOGY_NAME_PREFIXES = tuple(ALIAS_PREFIXES) + (ALIAS_PREFIX, ALIAS_PREFIX_PRO)
 except ImportError:
     BleakScanner = None
 
+SCAN_TIMEOUT = 10 # (seconds) upper bound for the active scan
+SCAN_SETTLE_TIME = 3 # (seconds) stop once no new Renogy device showed up for this long
+
+
+# Matched on the advertised name only: the notify/write UUIDs are characteristics and never show
+# up in an advertisement's service UUIDs
+def _is_renogy_device(name):
+    return bool(name) and name.startswith(RENOGY_NAME_PREFIXES)
+
 class RenogyBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def async_step_user(self, user_input=None):
         schema = vol.Schema({
-            vol.Optional("scan_for_devices", default=True): bool
+            vol.Optional("scan_for_devices", default=True): bool,
+            vol.Optional("expected_devices", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
         })
 
         if user_input is not None:
             if user_input.get("scan_for_devices"):
+                self.expected_devices = user_input.get("expected_devices", 0)
                 return await self.async_step_scan()
             else:
                 return await self.async_step_manual()
@@ -53,7 +80,7 @@ class RenogyBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.device_index = {d.address: d for d in self.devices}
 
         schema = vol.Schema({
-            vol.Required("mac"): vol.In(device_options)
+            vol.Required("macs", default=list(device_options)[:1]): cv.multi_select(device_options)
         })
 
         return self.async_show_form(
@@ -62,11 +89,31 @@ class RenogyBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def async_step_select_device(self, user_input=None):
-        selected_mac = user_input["mac"]
+        selected = list(user_input["macs"])
+        if not selected:
+            return await self.async_step_manual()
+        adapter = await self._get_default_adapter()
+
+        # Batch onboarding: every extra device gets its own import flow with default settings
+        for mac in selected[1:]:
+            device = self.device_index[mac]
+            self.hass.async_create_task(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_IMPORT},
+                    data={
+                        "alias": device.name or "Renogy Shunt",
+                        "mac": mac,
+                        "adapter": adapter,
+                        "device_id": "255",
+                    },
+                )
+            )
+
+        selected_mac = selected[0]
         device = self.device_index[selected_mac]
 
         alias = device.name or "Renogy Shunt"
-        adapter = await self._get_default_adapter()
         device_id = "255"
 
         schema = vol.Schema({
@@ -96,16 +143,76 @@ class RenogyBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def async_step_confirm_entry(self, user_input=None):
-        await self.async_set_unique_id(user_input["mac"])
+        mac = user_input["mac"].upper()
+        # Older entries keep the MAC as typed, so compare case-insensitively
+        if mac in self._configured_macs():
+            return self.async_abort(reason="already_configured")
+        await self.async_set_unique_id(mac)
         self._abort_if_unique_id_configured()
         return self.async_create_entry(title=user_input["alias"], data=user_input)
 
     async def async_step_import(self, import_config):
-        """Import existing YAML config into config entries."""
+        """Import existing YAML config or a batch-onboarded device into config entries."""
+        if import_config and import_config.get("mac"):
+            return await self.async_step_confirm_entry(import_config)
         return await self.async_step_user(import_config)
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return RenogyBLEOptionsFlow(config_entry)
+
+    def _configured_macs(self):
+        return {unique_id.upper() for unique_id in self._async_current_ids() if unique_id}
+
     async def _async_scan_ble(self):
-        return await BleakScanner.discover()
+        """Return Renogy devices, preferring cached advertisements and exiting the scan early."""
+        configured = self._configured_macs()
+        expected = getattr(self, "expected_devices", 0)
+        found = {}
+
+        # Advertisements already seen by the HA bluetooth integration cost nothing
+        try:
+            from homeassistant.components import bluetooth
+            for info in bluetooth.async_discovered_service_info(self.hass):
+                if info.address.upper() not in configured and _is_renogy_device(info.name):
+                    found[info.address] = info
+        except Exception as e:
+            _LOGGER.debug("No cached advertisements available: %s", e)
+
+        if expected and len(found) >= expected:
+            return list(found.values())
+
+        new_device = asyncio.Event()
+        done = asyncio.Event()
+
+        def detection_callback(device, advertisement_data):
+            if device.address in found or device.address.upper() in configured:
+                return
+            name = device.name or advertisement_data.local_name
+            if _is_renogy_device(name):
+                _LOGGER.debug("Discovered %s [%s]", name, device.address)
+                found[device.address] = device
+                new_device.set()
+                if expected and len(found) >= expected:
+                    done.set()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SCAN_TIMEOUT
+        async with BleakScanner(detection_callback=detection_callback):
+            while not done.is_set():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # Once something matched, only wait SCAN_SETTLE_TIME for more to show up
+                wait = min(remaining, SCAN_SETTLE_TIME) if found else remaining
+                new_device.clear()
+                try:
+                    await asyncio.wait_for(new_device.wait(), wait)
+                except asyncio.TimeoutError:
+                    if found:
+                        break
+        return list(found.values())
 
     async def _get_default_adapter(self):
         # Run blocking os.listdir in executor
@@ -113,3 +220,46 @@ class RenogyBLEConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             lambda: [f for f in os.listdir("/sys/class/bluetooth/") if f.startswith("hci")]
         )
         return adapters[0] if adapters else "hci0"
+
+
+class RenogyBLEOptionsFlow(config_entries.OptionsFlow):
+    """Live-tunable settings; applied to the running client by the entry update listener."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_deadbands(user_input.get(CONF_DEADBANDS, ""))
+            except ValueError:
+                errors[CONF_DEADBANDS] = "invalid_deadbands"
+            if not user_input.get(CONF_FIELDS):
+                errors[CONF_FIELDS] = "no_fields"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        current = {**self._entry.data, **self._entry.options}
+        fields = current.get(CONF_FIELDS)
+        if fields is None:
+            fields = list(SENSOR_TYPES)
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+
+        schema = vol.Schema({
+            vol.Required(CONF_POLL_INTERVAL, default=current.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)):
+                vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(CONF_AGGREGATION_WINDOW, default=current.get(CONF_AGGREGATION_WINDOW, DEFAULT_AGGREGATION_WINDOW)):
+                vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_DEADBANDS, default=current.get(CONF_DEADBANDS, "")): str,
+            vol.Required(CONF_FIELDS, default=fields): cv.multi_select(
+                {key: name for key, (name, _unit) in SENSOR_TYPES.items()}
+            ),
+            vol.Required(CONF_ADAPTER, default=current.get(CONF_ADAPTER, "hci0")): str,
+            vol.Required(CONF_STALL_MULTIPLE, default=current.get(CONF_STALL_MULTIPLE, DEFAULT_STALL_MULTIPLE)):
+                vol.All(vol.Coerce(float), vol.Range(min=1.5)),
+            vol.Optional(CONF_WORKER_SOCKET, default=current.get(CONF_WORKER_SOCKET, "")): str,
+        })
+
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
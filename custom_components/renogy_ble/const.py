@@ -1,4 +1,12 @@
-
 """Constants for the Renogy BLE integration."""
 
-DOMAIN = "renogy_ble"
\ No newline at end of file
+DOMAIN = "renogy_ble"
+
+# Options (live tunable, see Settings.ClientSettings)
+CONF_POLL_INTERVAL = "poll_interval"
+CONF_AGGREGATION_WINDOW = "aggregation_window"
+CONF_DEADBANDS = "deadbands"
+CONF_FIELDS = "fields"
+CONF_ADAPTER = "adapter"
+CONF_STALL_MULTIPLE = "stall_multiple"
+CONF_WORKER_SOCKET = "worker_socket"
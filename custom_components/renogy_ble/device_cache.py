@@ -0,0 +1,43 @@
+"""Persistent connection cache for warm reconnects after a Home Assistant restart."""
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.device_cache"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class DeviceCache:
+    """Last working adapter and GATT handles per MAC, kept in HA storage."""
+
+    def __init__(self, hass: HomeAssistant):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data = {}
+
+    async def async_load(self) -> None:
+        self._data = await self._store.async_load() or {}
+
+    def get(self, mac: str):
+        return self._data.get(mac.upper())
+
+    def update(self, mac: str, info: dict) -> None:
+        if self._data.get(mac.upper()) == info:
+            return
+        _LOGGER.debug("Caching connection info for %s: %s", mac, info)
+        self._data[mac.upper()] = info
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+
+async def async_get_device_cache(hass: HomeAssistant) -> DeviceCache:
+    cache = hass.data[DOMAIN].get("device_cache")
+    if cache is None:
+        cache = DeviceCache(hass)
+        await cache.async_load()
+        cache = hass.data[DOMAIN].setdefault("device_cache", cache)
+    return cache
@@ -18,9 +18,14 @@ along with renogy_ble. If not, see <https://www.gnu.org/licenses/>.
 import logging
 _LOGGER = logging.getLogger(__name__)
 
-from homeassistant.helpers.entity import Entity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import CONNECTION_BLUETOOTH
+try:
+    from homeassistant.helpers.device_registry import DeviceInfo
+except ImportError:  # HA < 2023.9
+    from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
 
@@ -30,6 +35,21 @@ SENSOR_TYPES = {
     'discharge_amps': ['Discharge Amps', 'A'],
     'discharge_watts': ['Discharge Watts', 'W'],
     'state_of_charge': ['State of Charge', '%'],
+    'temperature_sensor_1': ['Temperature Sensor 1', '°C'],
+    'temperature_sensor_2': ['Temperature Sensor 2', '°C'],
+}
+
+# Created disabled; enabling one adds its field to the client's decode plan
+SENSOR_DISABLED_BY_DEFAULT = {'temperature_sensor_1', 'temperature_sensor_2'}
+
+SENSOR_DEVICE_CLASSES = {
+    'charge_battery_voltage': SensorDeviceClass.VOLTAGE,
+    'starter_battery_voltage': SensorDeviceClass.VOLTAGE,
+    'discharge_amps': SensorDeviceClass.CURRENT,
+    'discharge_watts': SensorDeviceClass.POWER,
+    'state_of_charge': SensorDeviceClass.BATTERY,
+    'temperature_sensor_1': SensorDeviceClass.TEMPERATURE,
+    'temperature_sensor_2': SensorDeviceClass.TEMPERATURE,
 }
 
 # List of current sensor entities
@@ -45,82 +65,82 @@ async def async_setup_entry(
     conf = entry.data
     alias = conf.get("alias")
     mac = conf.get("mac")
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
 
     entities = [
-        RenogyBLESensor(sensor_type, alias, mac)
+        RenogyBLESensor(sensor_type, alias, mac, client)
         for sensor_type in SENSOR_TYPES
     ]
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
     # Keep track for updates/unload
     hass.data.setdefault(DOMAIN, {}).setdefault("entities", []).extend(entities)
     ENTITIES.extend(entities)
 
 
-class RenogyBLESensor(Entity):
-    """Representation of a single Renogy BLE sensor."""
+class RenogyBLESensor(SensorEntity):
+    """Push-only Renogy BLE sensor; every attribute is fixed at construction."""
+
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, sensor_type: str, device_name: str, mac_addr: str):
+    def __init__(self, sensor_type: str, device_name: str, mac_addr: str, client=None):
         self._sensor_type = sensor_type
-        self._name = f"{device_name or mac_addr} {SENSOR_TYPES[sensor_type][0]}"
-        self._unit_of_measurement = SENSOR_TYPES[sensor_type][1]
-        self._state = "unavailable"
         self._mac_addr = mac_addr
+        self._client = client
+        self.alias = device_name
+        self._attr_name = f"{device_name or mac_addr} {SENSOR_TYPES[sensor_type][0]}"
+        self._attr_native_unit_of_measurement = SENSOR_TYPES[sensor_type][1]
+        self._attr_device_class = SENSOR_DEVICE_CLASSES.get(sensor_type)
+        self._attr_native_value = None
+        self._attr_available = False
+        self._attr_extra_state_attributes = {"mac_address": mac_addr}
+        self._attr_entity_registry_enabled_default = sensor_type not in SENSOR_DISABLED_BY_DEFAULT
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, mac_addr)},
+            connections={(CONNECTION_BLUETOOTH, mac_addr)},
+            name=device_name or mac_addr,
+            manufacturer="Renogy",
+            model="Smart Shunt",
+        )
 
         # Build a safe entity_id, e.g. sensor.mydevice_charge_battery_voltage
         base = (device_name or mac_addr).lower().replace('-', '').replace(' ', '_')
         self.entity_id = f"sensor.{base}_{sensor_type}"
         self._attr_unique_id = self.entity_id
 
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @property
-    def state(self):
-        return self._state
-
-    @property
-    def unit_of_measurement(self) -> str:
-        return self._unit_of_measurement
-
-    @property
-    def attributes(self) -> dict:
-        return {
-            "unit_of_measurement": self._unit_of_measurement,
-            "mac_address": self._mac_addr,
-        }
-
-    @property
-    def available(self) -> bool:
-        return self._state != "unavailable"
-
-    @property
-    def device_class(self):
-        if "voltage" in self._sensor_type:
-            return "voltage"
-        if "amps" in self._sensor_type:
-            return "current"
-        if "watts" in self._sensor_type:
-            return "power"
-        if "state_of_charge" in self._sensor_type:
-            return "battery"
-        return None
-
-    @property
-    def unique_id(self) -> str:
-        return self._attr_unique_id
-
-    def update(self):
-        """Called by Home Assistant to refresh state; we do nothing."""
-        pass
-
-
-def update_sensors(data: dict) -> None:
-    """Push new BLE data into each sensor and schedule a state update."""
+    async def async_added_to_hass(self) -> None:
+        # Only enabled entities are added, so this is what drives the client's decode plan
+        if self._client is not None:
+            self._client.set_field_demand(self.entity_id, (self._sensor_type,))
+
+    async def async_will_remove_from_hass(self) -> None:
+        # Entries reload at runtime (options, unload), so stop routing updates to this object
+        if self in ENTITIES:
+            ENTITIES.remove(self)
+        if self._client is not None:
+            self._client.release_field_demand(self.entity_id)
+
+
+def update_sensors(data: dict, mac_addr: str = None) -> None:
+    """Push new BLE data into the sensors of one device (or all when mac_addr is None)."""
     for entity in ENTITIES:
+        if mac_addr is not None and entity._mac_addr != mac_addr:
+            continue
         new_state = data.get(entity._sensor_type)
         if new_state is None:
             continue
-        entity._state = new_state
-        entity.schedule_update_ha_state()
\ No newline at end of file
+        entity._attr_native_value = new_state
+        entity._attr_available = True
+        if entity.hass is not None:
+            entity.async_write_ha_state()
+
+
+def set_available(mac_addr: str, available: bool) -> None:
+    """Mark every sensor of a device (un)available; new data makes them available again."""
+    for entity in ENTITIES:
+        if entity._mac_addr != mac_addr or entity._attr_available == available:
+            continue
+        entity._attr_available = available
+        if entity.hass is not None:
+            entity.async_write_ha_state()
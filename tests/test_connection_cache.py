@@ -0,0 +1,93 @@
+import asyncio
+import json
+from custom_components.renogy_ble import BLE
+from custom_components.renogy_ble.ConnectionCache import FileConnectionCache
+from custom_components.renogy_ble.ShuntClient import ShuntClient
+
+MAC = 'AA:BB:CC:DD:EE:FF'
+CONFIG = {'device': {'alias': 'shunt', 'mac_addr': MAC, 'device_id': 255}}
+CACHED = {'adapter': 'hci0', 'path': '/org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF', 'notify_handle': 14, 'write_handle': None}
+
+
+class FakeServices:
+    def get_characteristic(self, uuid):
+        return None
+
+
+class FakeBleakClient:
+    fail_connect = False
+    created = []
+
+    def __init__(self, address_or_ble_device, **kwargs):
+        self.target = address_or_ble_device
+        self.is_connected = False
+        self.mtu_size = 247
+        self.services = FakeServices()
+        FakeBleakClient.created.append(self)
+
+    async def connect(self):
+        if FakeBleakClient.fail_connect:
+            raise OSError("org.freedesktop.DBus.Error.UnknownObject")
+        self.is_connected = True
+
+    async def start_notify(self, char, callback):
+        pass
+
+    async def disconnect(self):
+        self.is_connected = False
+
+
+def _patch_ble(monkeypatch, fail_connect=False):
+    scans = []
+
+    async def discover(**kwargs):
+        scans.append(kwargs)
+        return []
+
+    FakeBleakClient.fail_connect = fail_connect
+    FakeBleakClient.created = []
+    monkeypatch.setattr(BLE, 'BleakClient', FakeBleakClient)
+    monkeypatch.setattr(BLE.BleakScanner, 'discover', discover)
+    monkeypatch.setattr(BLE.platform, 'system', lambda: 'Linux')
+    return scans
+
+
+def _connect(cache):
+    async def scenario():
+        client = ShuntClient(CONFIG)
+        client.connection_cache = dict(cache)
+        cached = []
+        client.on_connection_cached = lambda c, info: cached.append(info)
+        await client.connect()
+        return client
+    return asyncio.run(scenario())
+
+
+def test_cached_start_skips_the_scan(monkeypatch):
+    scans = _patch_ble(monkeypatch)
+    client = _connect(CACHED)
+    assert scans == []
+    assert client.device.is_connected
+    assert FakeBleakClient.created[0].target.details['path'] == CACHED['path']
+    assert client.device.notify_handle == 14
+
+
+def test_unknown_device_falls_back_to_the_scan(monkeypatch):
+    scans = _patch_ble(monkeypatch, fail_connect=True)
+    client = _connect(CACHED)
+    assert len(scans) == 1
+    assert client.connection_cache is None
+
+
+def test_cache_for_another_adapter_is_ignored(monkeypatch):
+    scans = _patch_ble(monkeypatch)
+    _connect(dict(CACHED, adapter='hci1'))
+    assert len(scans) == 1
+    assert FakeBleakClient.created == []
+
+
+def test_file_cache_persists_across_restarts(tmp_path):
+    path = tmp_path / 'shunts.cache.json'
+    FileConnectionCache(str(path)).update(MAC.lower(), CACHED)
+    assert json.loads(path.read_text()) == {MAC: CACHED}
+    assert FileConnectionCache(str(path)).get(MAC) == CACHED
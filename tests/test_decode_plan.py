@@ -0,0 +1,77 @@
+import asyncio
+from custom_components.renogy_ble.ShuntClient import ShuntClient, ALL_SHUNT_FIELDS
+from custom_components.renogy_ble.Utils import bytes_to_int
+
+CONFIG = {'device': {'alias': 'shunt', 'mac_addr': 'AA:BB:CC:DD:EE:FF', 'device_id': 255, 'aggregation_window': 0}}
+
+
+def _frame(amps_milli, volts_milli, soc_tenths):
+    frame = bytearray(73)
+    frame[0] = 0x01
+    frame[1] = 0x57
+    frame[21:24] = amps_milli.to_bytes(3, 'big')
+    frame[25:28] = volts_milli.to_bytes(3, 'big')
+    frame[34:36] = soc_tenths.to_bytes(2, 'big')
+    return frame
+
+
+def _run(setup, frames):
+    async def scenario():
+        published = []
+        client = ShuntClient(CONFIG, on_data_callback=lambda c, data: published.append(dict(data)))
+        setup(client)
+        for frame in frames:
+            client.on_data_received(frame)
+        client.watchdog.stop()
+        return client, published
+    return asyncio.run(scenario())
+
+
+def test_standalone_client_decodes_every_field():
+    client, published = _run(lambda c: None, [_frame(2000, 12800, 955)])
+    assert set(published[0]) == ALL_SHUNT_FIELDS
+
+
+def test_derived_field_pulls_in_its_dependencies():
+    def setup(client):
+        client.set_field_demand('sensor.shunt_discharge_watts', ('discharge_watts',))
+
+    client, published = _run(setup, [_frame(2000, 12800, 955)])
+    assert published[0]['discharge_watts'] == 25.6
+    assert set(published[0]) == {'discharge_watts', 'discharge_amps', 'charge_battery_voltage'}
+
+
+def test_new_demand_is_decoded_from_an_unchanged_frame():
+    async def scenario():
+        published = []
+        client = ShuntClient(CONFIG, on_data_callback=lambda c, data: published.append(dict(data)))
+        client.set_field_demand('sensor.shunt_state_of_charge', ('state_of_charge',))
+        frame = _frame(2000, 12800, 955)
+        client.on_data_received(frame)
+        client.set_field_demand('sensor.shunt_discharge_amps', ('discharge_amps',))
+        client.on_data_received(frame)
+        client.watchdog.stop()
+        return published
+
+    published = asyncio.run(scenario())
+    assert published[0] == {'state_of_charge': 95.5}
+    assert published[1]['discharge_amps'] == 2.0
+
+
+def test_releasing_every_consumer_decodes_nothing():
+    def setup(client):
+        client.set_field_demand('sensor.shunt_state_of_charge', ('state_of_charge',))
+        client.release_field_demand('sensor.shunt_state_of_charge')
+
+    client, published = _run(setup, [_frame(2000, 12800, 955)])
+    assert client._decode_plan == []
+    assert published == []
+
+
+def test_unplugged_temperature_probe_reads_zero():
+    frame = _frame(2000, 12800, 955)
+    frame[67:69] = b'\x12\x34' # noise behind the empty first byte of probe 1
+    frame[70:73] = b'\x01\x61\x12'
+    client, published = _run(lambda c: None, [frame])
+    assert published[0]['temperature_sensor_1'] == 0.0
+    assert published[0]['temperature_sensor_2'] == bytes_to_int(frame, 70, 3, scale=0.001)
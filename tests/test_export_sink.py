@@ -0,0 +1,93 @@
+import asyncio
+from custom_components.renogy_ble import ExportSink
+from custom_components.renogy_ble.ExportSink import LineProtocolExporter
+
+
+async def _start_sink():
+    """Local TCP stand-in for a line protocol listener."""
+    received = []
+
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            received.append(line.decode().rstrip('\n'))
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    return server, server.sockets[0].getsockname()[1], received
+
+
+def test_tcp_export_delivers_batches():
+    async def scenario():
+        server, port, received = await _start_sink()
+        exporter = LineProtocolExporter(f"tcp://127.0.0.1:{port}", batch_size=2, flush_interval=60)
+        exporter.start(asyncio.get_running_loop())
+        for i in range(5):
+            exporter.add({'device': 'shunt'}, {'discharge_amps': float(i)}, timestamp=1)
+        await exporter.stop()
+        await asyncio.sleep(0.1)
+        server.close()
+        await server.wait_closed()
+        return exporter, received
+
+    exporter, received = asyncio.run(scenario())
+    assert len(received) == 5
+    assert received[0] == 'renogy,device=shunt discharge_amps=0.0 1000000000'
+    assert exporter.stats()['exported'] == 5
+
+
+def test_spooled_samples_replay_once_sink_is_back(tmp_path):
+    async def scenario():
+        server, port, received = await _start_sink()
+        server.close()
+        await server.wait_closed()
+        exporter = LineProtocolExporter(f"tcp://127.0.0.1:{port}", batch_size=100, flush_interval=60,
+                                        spool_path=str(tmp_path / 'export.spool'))
+        exporter.start(asyncio.get_running_loop())
+        exporter.add({}, {'soc': 1.0}, timestamp=1)
+        await exporter.flush()
+        spooled = exporter.stats()['spooled']
+
+        server, port2, received = await _start_sink()
+        exporter.url = exporter.url._replace(netloc=f"127.0.0.1:{port2}")
+        exporter.add({}, {'soc': 2.0}, timestamp=2)
+        await exporter.stop()
+        await asyncio.sleep(0.1)
+        server.close()
+        await server.wait_closed()
+        return spooled, received
+
+    spooled, received = asyncio.run(scenario())
+    assert spooled == 1
+    assert [line.split(' ')[1] for line in received] == ['soc=1.0', 'soc=2.0']
+
+
+def test_black_holed_sink_stays_bounded(tmp_path, monkeypatch):
+    async def never_connects(*args, **kwargs):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(ExportSink, 'SEND_TIMEOUT', 0.2)
+    monkeypatch.setattr(ExportSink.asyncio, 'open_connection', never_connects)
+
+    async def scenario():
+        exporter = LineProtocolExporter("tcp://192.0.2.1:8094", batch_size=10, flush_interval=60,
+                                        spool_path=str(tmp_path / 'export.spool'))
+        exporter.start(asyncio.get_running_loop())
+        peak = 0
+        for i in range(200):
+            exporter.add({}, {'soc': float(i)}, timestamp=i)
+            peak = max(peak, len(exporter.buffer))
+            await asyncio.sleep(0)
+        pending = [t for t in asyncio.all_tasks() if t.get_coro().__qualname__ == 'LineProtocolExporter.flush']
+        await asyncio.sleep(0.5)
+        exporter.flush_timer.cancel()
+        return exporter, peak, len(pending)
+
+    exporter, peak, pending = asyncio.run(scenario())
+    assert peak <= exporter.max_buffered
+    # One flush stuck on the connect plus at most one waiting for the lock
+    assert pending <= 2
+    assert exporter.stats()['errors'] >= 1
+    assert exporter.stats()['spooled'] > 0
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from custom_components.renogy_ble.IngestQueue import IngestQueue, POLICY_COALESCE, POLICY_DROP_OLDEST
+
+
+async def _drain(queue):
+    items = []
+    while queue.depth:
+        items.append(await queue.get())
+        queue.task_done()
+    return items
+
+
+def test_drop_oldest_keeps_newest_items():
+    async def scenario():
+        queue = IngestQueue(maxsize=3, policy=POLICY_DROP_OLDEST)
+        for i in range(5):
+            queue.put_nowait(i)
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(scenario())
+    assert items == [2, 3, 4]
+    stats = queue.stats()
+    assert stats['received'] == 5
+    assert stats['processed'] == 3
+    assert stats['dropped'] == 2
+    assert stats['coalesced'] == 0
+    assert stats['max_depth'] == 3
+
+
+def test_coalesce_keeps_only_latest_item():
+    async def scenario():
+        queue = IngestQueue(maxsize=3, policy=POLICY_COALESCE)
+        for i in range(4):
+            queue.put_nowait(i)
+        after_overflow = queue.depth
+        queue.put_nowait(4)
+        return queue, after_overflow, await _drain(queue)
+
+    queue, after_overflow, items = asyncio.run(scenario())
+    # The fourth item superseded the three pending ones
+    assert after_overflow == 1
+    assert items == [3, 4]
+    stats = queue.stats()
+    assert stats['coalesced'] == 3
+    assert stats['dropped'] == 0
+    assert stats['max_depth'] == 3
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        IngestQueue(policy='block')
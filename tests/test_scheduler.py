@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from custom_components.renogy_ble.Scheduler import GOLDEN_RATIO, Scheduler, get_scheduler
+
+
+def _run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_calls_fire_in_deadline_order_whatever_the_push_order():
+    async def scenario():
+        scheduler = Scheduler(asyncio.get_running_loop())
+        fired = []
+        scheduler.call_later(0.15, fired.append, 'late', name='late')
+        scheduler.call_later(0.05, fired.append, 'early', name='early')
+        cancelled = scheduler.call_later(0.10, fired.append, 'cancelled')
+        cancelled.cancel()
+        scheduler.call_later(0.10, fired.append, 'middle')
+        await asyncio.sleep(0.25)
+        return scheduler, fired
+
+    scheduler, fired = _run(scenario)
+    assert fired == ['early', 'middle', 'late']
+    assert scheduler.stats()['pending'] == 0
+
+
+def test_earlier_deadline_rearms_the_timer():
+    async def scenario():
+        scheduler = Scheduler(asyncio.get_running_loop())
+        loop = asyncio.get_running_loop()
+        fired = {}
+        scheduler.call_later(1.0, lambda: fired.setdefault('far', loop.time()))
+        start = loop.time()
+        scheduler.call_later(0.05, lambda: fired.setdefault('near', loop.time()))
+        await asyncio.sleep(0.2)
+        return start, fired
+
+    start, fired = _run(scenario)
+    assert 'far' not in fired
+    assert fired['near'] - start < 0.15
+
+
+def test_periodic_deadlines_are_staggered():
+    async def scenario():
+        scheduler = Scheduler(asyncio.get_running_loop())
+        now = scheduler.loop.time()
+        calls = [scheduler.call_every(10, name=f"poll:{i}") for i in range(3)]
+        offsets = [call.when - now for call in calls]
+        for call in calls:
+            call.cancel()
+        return offsets
+
+    offsets = _run(scenario)
+    expected = [(i * GOLDEN_RATIO % 1.0) * 10 for i in range(3)]
+    assert offsets == pytest.approx(expected, abs=0.05)
+
+
+def test_periodic_call_survives_a_failing_callback():
+    async def scenario():
+        scheduler = Scheduler(asyncio.get_running_loop())
+        ticks = []
+
+        def callback():
+            ticks.append(len(ticks))
+            if len(ticks) == 2:
+                raise RuntimeError("boom")
+
+        call = scheduler.call_every(0.02, callback, name='flaky')
+        await asyncio.sleep(0.15)
+        call.cancel()
+        await asyncio.sleep(0.05)
+        return scheduler, ticks
+
+    scheduler, ticks = _run(scenario)
+    assert len(ticks) >= 4
+    assert scheduler.stats()['pending'] == 0
+
+
+def test_periodic_wait_and_slip_stats():
+    async def scenario():
+        scheduler = get_scheduler()
+        assert get_scheduler() is scheduler
+        call = scheduler.call_every(0.02, name='poll:test')
+        for _ in range(3):
+            await call.wait()
+        call.cancel()
+        await scheduler.sleep(0.01, name='sleep:test')
+        return scheduler.stats()
+
+    stats = _run(scenario)
+    assert stats['slip']['poll:test']['count'] >= 3
+    assert stats['slip']['poll:test']['max_ms'] >= stats['slip']['poll:test']['avg_ms'] >= 0
+    assert stats['slip']['sleep:test']['count'] == 1
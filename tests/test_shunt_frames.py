@@ -0,0 +1,84 @@
+import asyncio
+from custom_components.renogy_ble.ShuntClient import ShuntClient
+
+CONFIG = {'device': {'alias': 'shunt', 'mac_addr': 'AA:BB:CC:DD:EE:FF', 'device_id': 255, 'queue_size': 2}}
+
+
+def _frame(millivolts):
+    frame = bytearray(73)
+    frame[0] = 0x01
+    frame[1] = 0x57
+    frame[25:28] = millivolts.to_bytes(3, 'big')
+    return frame
+
+
+def _fragments(frame, size=20):
+    return [frame[i:i + size] for i in range(0, len(frame), size)]
+
+
+def _client():
+    client = ShuntClient(CONFIG)
+    client.reassemble = True
+    return client
+
+
+def test_queue_drops_whole_frames_only():
+    async def scenario():
+        client = _client()
+        published = []
+        client.on_sample_callback = lambda c, data: published.append(data['charge_battery_voltage'])
+        # Ten frames into a queue of two: the oldest are dropped, but only as whole frames
+        for i in range(10):
+            for fragment in _fragments(_frame(12000 + i * 100)):
+                client._enqueue_notification(fragment)
+        while client.ingest_queue.depth:
+            client.on_data_received(await client.ingest_queue.get())
+        return client, published
+
+    client, published = asyncio.run(scenario())
+    assert client.frames_completed == 10
+    assert published == [12.8, 12.9]
+
+
+def test_frame_with_lost_fragment_is_discarded():
+    async def scenario():
+        client = _client()
+        frames = []
+        client.ingest_queue.put_nowait = frames.append
+        for i in range(3):
+            for fragment in _fragments(_frame(12000 + i)):
+                client._enqueue_notification(fragment)
+        # Lose the second fragment of the next frame in the BLE stack
+        fragments = _fragments(_frame(13000))
+        for fragment in [fragments[0]] + fragments[2:]:
+            client._enqueue_notification(fragment)
+        for millivolts in (14000, 15000):
+            for fragment in _fragments(_frame(millivolts)):
+                client._enqueue_notification(fragment)
+        return client, frames
+
+    client, frames = asyncio.run(scenario())
+    # The incomplete frame is dropped at the next header instead of being spliced with it
+    assert client.frames_rejected == 1
+    assert frames == [_frame(m) for m in (12000, 12001, 12002, 14000, 15000)]
+
+
+def test_identical_frame_after_stall_is_published():
+    async def scenario():
+        published = []
+        config = {'device': dict(CONFIG['device'], aggregation_window=0)}
+        client = ShuntClient(config, on_data_callback=lambda c, data: published.append(dict(data)))
+        client._recovering = True # keep the test off the radio
+        frame = _frame(12800)
+        client.on_data_received(bytearray(frame))
+        client.on_data_received(bytearray(frame))
+        before_stall = len(published)
+        client._on_stall()
+        client.on_data_received(bytearray(frame))
+        client.watchdog.stop()
+        return before_stall, published
+
+    before_stall, published = asyncio.run(scenario())
+    assert before_stall == 1
+    assert len(published) == 2
+    assert published[-1]['charge_battery_voltage'] == 12.8
@@ -0,0 +1,82 @@
+import asyncio
+from custom_components.renogy_ble.Transport import create_transport, _LINKS
+from custom_components.renogy_ble.Utils import crc16_modbus
+
+
+async def _start_gateway():
+    """Local stand-in for a Modbus RTU-over-TCP gateway answering every read with one register."""
+    stats = {'connections': 0, 'requests': 0}
+
+    async def handle(reader, writer):
+        stats['connections'] += 1
+        try:
+            while True:
+                request = await reader.readexactly(8)
+                stats['requests'] += 1
+                response = bytes((request[0], 3, 2, 0x00, 0x2A))
+                writer.write(response + crc16_modbus(response))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    return server, server.sockets[0].getsockname()[1], stats
+
+
+def _read_request(device_id):
+    request = bytes((device_id, 3, 0x01, 0x00, 0x00, 0x01))
+    return request + crc16_modbus(request)
+
+
+def _transport(port, device_id, on_data):
+    return create_transport(
+        {'transport': 'tcp', 'host': '127.0.0.1', 'port': port, 'device_id': device_id},
+        on_resolved=lambda: None, on_data=on_data, on_connect_fail=lambda e: None,
+        notify_uuid=None, write_uuid=None,
+    )
+
+
+def test_failing_handler_keeps_the_pooled_link():
+    async def scenario():
+        server, port, stats = await _start_gateway()
+        received = []
+
+        async def on_data(frame):
+            received.append(bytes(frame))
+            raise KeyError('data')
+
+        transport = _transport(port, 1, on_data)
+        assert await transport.connect()
+        for _ in range(4):
+            await transport.characteristic_write_value(_read_request(1))
+            await asyncio.sleep(0)
+        connected = transport.is_connected
+        await transport.disconnect()
+        server.close()
+        await server.wait_closed()
+        return stats, received, connected
+
+    stats, received, connected = asyncio.run(scenario())
+    assert connected
+    assert stats == {'connections': 1, 'requests': 4}
+    assert len(received) == 4 and received[0][:5] == bytes((1, 3, 2, 0x00, 0x2A))
+
+
+def test_devices_behind_one_gateway_share_a_link():
+    async def scenario():
+        server, port, stats = await _start_gateway()
+        received = []
+        transports = [_transport(port, device_id, received.append) for device_id in (1, 2)]
+        for transport in transports:
+            assert await transport.connect()
+        await asyncio.gather(*(t.characteristic_write_value(_read_request(i + 1)) for i, t in enumerate(transports)))
+        for transport in transports:
+            await transport.disconnect()
+        server.close()
+        await server.wait_closed()
+        return stats, received
+
+    stats, received = asyncio.run(scenario())
+    assert stats == {'connections': 1, 'requests': 2}
+    assert sorted(frame[0] for frame in received) == [1, 2]
+    assert not _LINKS
@@ -0,0 +1,93 @@
+import asyncio
+from custom_components.renogy_ble import Worker
+from custom_components.renogy_ble.Worker import RemoteShuntClient, WorkerConnection
+from custom_components.renogy_ble.WorkerProtocol import (
+    HEADER, MSG_ERROR, MSG_SAMPLE, SAMPLE_FIELDS, decode_error, decode_sample, encode_error, encode_sample,
+)
+
+MAC = 'AA:BB:CC:DD:EE:FF'
+
+
+def _split(message):
+    length, msg_type = HEADER.unpack_from(message)
+    payload = message[HEADER.size:]
+    assert len(payload) == length
+    return msg_type, payload
+
+
+def test_sample_round_trip():
+    data = {name: float(i) + 0.5 for i, name in enumerate(SAMPLE_FIELDS)}
+    data['__device'] = 'not a number'
+    data['unknown_field'] = 1.0
+    msg_type, payload = _split(encode_sample(MAC.lower(), 'Shunt', 1700000000.25, data))
+    assert msg_type == MSG_SAMPLE
+    mac, alias, timestamp, decoded = decode_sample(payload)
+    assert (mac, alias, timestamp) == (MAC, 'Shunt', 1700000000.25)
+    assert decoded == {name: data[name] for name in SAMPLE_FIELDS}
+
+
+def test_error_round_trip():
+    msg_type, payload = _split(encode_error(MAC, 'No notifications for 30s'))
+    assert msg_type == MSG_ERROR
+    assert decode_error(payload) == (MAC, 'No notifications for 30s')
+
+
+def test_connection_dispatches_and_reconnects(tmp_path, monkeypatch):
+    monkeypatch.setattr(Worker, 'RECONNECT_DELAY', 0.05)
+    socket_path = str(tmp_path / 'worker.sock')
+
+    async def scenario():
+        sessions = []
+
+        async def handle(reader, writer):
+            # First session sends a sample and an error then drops; the second sends one more sample
+            sessions.append(writer)
+            writer.write(encode_sample(MAC, 'Shunt', 1.0, {'state_of_charge': 95.5}))
+            if len(sessions) == 1:
+                writer.write(encode_error(MAC, 'stalled'))
+                writer.write(encode_sample('11:22:33:44:55:66', 'Other', 1.0, {'state_of_charge': 1.0}))
+                await writer.drain()
+                writer.close()
+            else:
+                await writer.drain()
+
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+        events = []
+        connection = WorkerConnection(socket_path)
+        client = RemoteShuntClient(
+            {'alias': 'Shunt', 'mac_addr': MAC.lower(), 'aggregation_window': 0}, connection,
+            on_data_callback=lambda c, data: events.append(('data', dict(data))),
+            on_error_callback=lambda c, error: events.append(('error', str(error))),
+        )
+        client.start()
+        for _ in range(100):
+            if len([e for e in events if e[0] == 'data']) >= 2:
+                break
+            await asyncio.sleep(0.02)
+        client.stop()
+        server.close()
+        await server.wait_closed()
+        return events, len(sessions)
+
+    events, sessions = asyncio.run(scenario())
+    assert sessions == 2
+    assert events[0] == ('data', {'state_of_charge': 95.5})
+    assert events[1] == ('error', 'stalled')
+    assert events[-1] == ('data', {'state_of_charge': 95.5})
+    # Samples for MACs nobody registered are ignored
+    assert all(e[1] != {'state_of_charge': 1.0} for e in events)
+
+
+def test_remote_client_republishes_after_a_worker_error():
+    published = []
+    client = RemoteShuntClient(
+        {'alias': 'Shunt', 'mac_addr': MAC, 'aggregation_window': 0, 'deadbands': 'state_of_charge:1'},
+        WorkerConnection('/nonexistent.sock'),
+        on_data_callback=lambda c, data: published.append(dict(data)),
+    )
+    client.handle_sample(1.0, {'state_of_charge': 95.5})
+    client.handle_sample(2.0, {'state_of_charge': 95.6})
+    assert published == [{'state_of_charge': 95.5}]
+    client.handle_error('No notifications for 30s')
+    client.handle_sample(3.0, {'state_of_charge': 95.6})
+    assert published[-1] == {'state_of_charge': 95.6}